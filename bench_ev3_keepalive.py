@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ev3dev_ondevice_bridge requests per second on one persistent
+connection vs a new connection (and TLS handshake under --ssl) per request
+"""
+
+import argparse
+import http.client
+import ssl
+import time
+
+
+def connect(args):
+    if args.ssl:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return http.client.HTTPSConnection(args.host, args.port, timeout=30, context=context)
+    return http.client.HTTPConnection(args.host, args.port, timeout=30)
+
+
+def run(args, keep_alive: bool) -> float:
+    conn = connect(args)
+    reconnects = 0
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        conn.request("GET", args.path)
+        response = conn.getresponse()
+        response.read()
+        if not keep_alive or response.will_close:
+            conn.close()
+            conn = connect(args)
+            reconnects += keep_alive
+    elapsed = time.perf_counter() - start
+    conn.close()
+
+    rate = args.requests / elapsed
+    label = "one connection " if keep_alive else "new connections"
+    print(f"{label} | {rate:7.1f} req/s | {elapsed / args.requests * 1000:6.2f} ms/req"
+          + (f" | server closed {reconnects}x" if keep_alive else ""))
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EV3 bridge keep-alive benchmark")
+    parser.add_argument("--host", default="ev3dev.local", help="EV3 address")
+    parser.add_argument("--port", type=int, default=8080, help="Bridge port")
+    parser.add_argument("--ssl", action="store_true", help="Use HTTPS")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per mode")
+    parser.add_argument("--path", default="/sensor/touch/1", help="Endpoint to poll")
+    args = parser.parse_args()
+
+    print(f"📊 GET {args.path} x{args.requests} ({'HTTPS' if args.ssl else 'HTTP'})")
+    print("=" * 70)
+    fresh = run(args, keep_alive=False)
+    persistent = run(args, keep_alive=True)
+    print("=" * 70)
+    print(f"keep-alive: x{persistent / fresh:.1f} requests per second")
+
+
+if __name__ == "__main__":
+    main()
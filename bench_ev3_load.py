@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Load test: ev3dev_ondevice_bridge under mixed read/write traffic
+Several clients poll sensors while others send motor and sound commands;
+reports throughput and p50/p99 latency per request kind
+"""
+
+import argparse
+import http.client
+import json
+import random
+import ssl
+import threading
+import time
+
+READS = [
+    "/sensor/touch/1",
+    "/sensor/gyro/2/angle",
+    "/sensor/ultrasonic/4",
+    "/motor/position/A",
+    "/battery",
+]
+
+WRITES = [
+    {"cmd": "beep", "freq": 440, "dur": 50},
+    {"cmd": "motor_run_for", "port": "A", "speed": 20, "rotations": 0.1},
+    {"cmd": "screen_text", "text": "load", "x": 10, "y": 10},
+]
+
+
+def connect(args):
+    if args.ssl:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        return http.client.HTTPSConnection(args.host, args.port, timeout=30, context=context)
+    return http.client.HTTPConnection(args.host, args.port, timeout=30)
+
+
+def request(conn, kind: str):
+    if kind == "read":
+        conn.request("GET", random.choice(READS))
+    else:
+        body = json.dumps(random.choice(WRITES))
+        conn.request("POST", "/", body=body, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    response.read()
+    return response
+
+
+def client(args, deadline: float, results: dict, lock: threading.Lock):
+    samples = {"read": [], "write": []}
+    errors = 0
+    conn = connect(args)
+    while time.perf_counter() < deadline:
+        kind = "write" if random.random() < args.write_ratio else "read"
+        start = time.perf_counter()
+        try:
+            response = request(conn, kind)
+            if response.will_close or not args.keep_alive:
+                conn.close()
+                conn = connect(args)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = connect(args)
+            continue
+        samples[kind].append(time.perf_counter() - start)
+    conn.close()
+
+    with lock:
+        for kind, values in samples.items():
+            results[kind].extend(values)
+        results["errors"] += errors
+
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EV3 bridge load test")
+    parser.add_argument("--host", default="ev3dev.local", help="EV3 address")
+    parser.add_argument("--port", type=int, default=8080, help="Bridge port")
+    parser.add_argument("--ssl", action="store_true", help="Use HTTPS")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run")
+    parser.add_argument("--write-ratio", type=float, default=0.2,
+                        help="Fraction of requests that are commands")
+    parser.add_argument("--keep-alive", action="store_true",
+                        help="Reuse one connection per client (needs HTTP/1.1 server)")
+    args = parser.parse_args()
+
+    results = {"read": [], "write": [], "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=client, args=(args, deadline, results, lock), daemon=True)
+        for _ in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = len(results["read"]) + len(results["write"])
+    print(f"📊 {args.clients} clients, {args.duration:.0f}s, "
+          f"{args.write_ratio:.0%} writes, keep-alive {'on' if args.keep_alive else 'off'}")
+    print("=" * 70)
+    for kind in ("read", "write"):
+        values = results[kind]
+        print(f"{kind:5s} | {len(values):6d} req | {len(values) / elapsed:7.1f} req/s | "
+              f"p50 {percentile(values, 50) * 1000:7.1f} ms | "
+              f"p99 {percentile(values, 99) * 1000:7.1f} ms")
+    print("=" * 70)
+    print(f"total | {total / elapsed:7.1f} req/s | errors {results['errors']}")
+
+
+if __name__ == "__main__":
+    main()
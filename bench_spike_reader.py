@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SPIKE line reader throughput (lines per second)
+Baseline is the old str += / split('\n', 1) reader from SPIKEConnection
+"""
+
+import argparse
+import time
+
+from lego_bridge import SPIKELineFramer
+
+
+class LegacyLineReader:
+    """The previous read_line_nonblocking algorithm, minus the serial port"""
+
+    def __init__(self):
+        self.read_buffer = ""
+
+    def feed(self, data: bytes):
+        self.read_buffer += data.decode('utf-8', errors='ignore')
+
+    def read_line(self):
+        if '\n' in self.read_buffer:
+            line, self.read_buffer = self.read_buffer.split('\n', 1)
+            return line.strip()
+        return None
+
+
+def make_stream(lines: int) -> bytes:
+    """Hub-like telemetry, one line per sample"""
+    return b''.join(
+        f"SENSORS:{i % 100},{(i * 7) % 360},{(i * 13) % 1000},[0, 0, -980]\r\n".encode()
+        for i in range(lines)
+    )
+
+
+def chunks(stream: bytes, size: int):
+    return [stream[i:i + size] for i in range(0, len(stream), size)]
+
+
+def bench_legacy(parts) -> int:
+    reader = LegacyLineReader()
+    count = 0
+    for part in parts:
+        reader.feed(part)
+        # Best case for the old reader: drain every line, one call each
+        while True:
+            line = reader.read_line()
+            if line is None:
+                break
+            if line:
+                count += 1
+    return count
+
+
+def bench_framer(parts) -> int:
+    framer = SPIKELineFramer()
+    count = 0
+    for part in parts:
+        count += len(framer.feed(part))
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SPIKE line reader benchmark')
+    parser.add_argument('--lines', type=int, default=200000, help='Lines to process')
+    parser.add_argument('--chunks', default='64,1024,16384',
+                        help='Comma-separated serial read sizes (bytes)')
+    args = parser.parse_args()
+
+    stream = make_stream(args.lines)
+    print(f"📊 {args.lines} lines, {len(stream) / 1024:.0f} KiB")
+    print("=" * 70)
+
+    for size in (int(c) for c in args.chunks.split(',')):
+        parts = chunks(stream, size)
+        results = {}
+        for name, func in (('legacy', bench_legacy), ('framer', bench_framer)):
+            start = time.perf_counter()
+            count = func(parts)
+            elapsed = time.perf_counter() - start
+            assert count == args.lines, f"{name} returned {count} lines"
+            results[name] = count / elapsed
+        print(f"chunk {size:6d} B | legacy {results['legacy']:>12,.0f} lines/s | "
+              f"framer {results['framer']:>12,.0f} lines/s | "
+              f"x{results['framer'] / results['legacy']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
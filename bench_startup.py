@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: universal_bridge cold start (launch to "Server running")
+Compares lazy transport loading against the old eager imports, and lists
+the heaviest imports from `python -X importtime`
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+BRIDGE = HERE / "universal_bridge.py"
+
+# What universal_bridge used to import at module level, before running it
+EAGER_PRELUDE = """
+import runpy, sys
+for name in ('bleak', 'bluetooth', 'cryptography.x509',
+             'cryptography.hazmat.primitives.asymmetric.rsa'):
+    try:
+        __import__(name)
+    except ImportError:
+        pass
+sys.argv = [{bridge!r}] + sys.argv[1:]
+runpy.run_path({bridge!r}, run_name='__main__')
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def time_to_ready(extra_args, eager: bool, timeout: float = 60.0) -> float:
+    """Seconds from process launch until the bridge logs 'Server running'"""
+    args = ['--no-ssl', '--port', str(free_port())] + extra_args
+    if eager:
+        cmd = [sys.executable, '-c', EAGER_PRELUDE.format(bridge=str(BRIDGE))] + args
+    else:
+        cmd = [sys.executable, str(BRIDGE)] + args
+
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=HERE, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True)
+    try:
+        for line in proc.stderr:
+            if 'Server running' in line:
+                return time.perf_counter() - start
+            if time.perf_counter() - start > timeout:
+                break
+        raise RuntimeError(f"bridge did not start: {' '.join(cmd)}")
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def import_profile(top: int):
+    """Cumulative import time of the heaviest top-level imports"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import universal_bridge'],
+                            cwd=HERE, capture_output=True, text=True, env=dict(os.environ))
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[12:].split('|'))
+        # Top-level imports are not indented
+        if not name.startswith(' '):
+            rows.append((int(cumulative), name))
+    rows.sort(reverse=True)
+    print(f"import universal_bridge: top {top} imports (cumulative)")
+    for cumulative, name in rows[:top]:
+        print(f"   {cumulative / 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='universal_bridge startup benchmark')
+    parser.add_argument('--runs', type=int, default=5, help='Launches per variant')
+    parser.add_argument('--top', type=int, default=10, help='Imports to list')
+    args = parser.parse_args()
+
+    print("📊 universal_bridge cold start (--no-ssl)")
+    print("=" * 70)
+    variants = (
+        ('eager imports (old)', [], True),
+        ('lazy, ble,bt', [], False),
+        ('lazy, --transports ble', ['--transports', 'ble'], False),
+    )
+    baseline = None
+    for label, extra, eager in variants:
+        times = sorted(time_to_ready(extra, eager) for _ in range(args.runs))
+        median = times[len(times) // 2]
+        baseline = baseline or median
+        print(f"{label:24s} | median {median * 1000:7.1f} ms | x{baseline / median:.2f}")
+    print("=" * 70)
+    import_profile(args.top)
+
+
+if __name__ == "__main__":
+    main()
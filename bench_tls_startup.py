@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark: universal_bridge certificate startup
+Certificate check parsing the PEM (as before the sidecar existed) vs
+reading the cached expiry sidecar; both include building the SSL context
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+# Runs in a fresh interpreter so module imports are counted
+STARTUP_SNIPPET = """
+import sys, time
+from universal_bridge import CertificateManager
+start = time.perf_counter()
+manager = CertificateManager()
+assert manager.generate_cert()
+manager.get_ssl_context()
+print(time.perf_counter() - start, 'cryptography' in sys.modules)
+"""
+
+
+def run_startup(home: str, drop_sidecar: bool):
+    env = dict(os.environ, HOME=home, USERPROFILE=home)
+    if drop_sidecar:
+        sidecar = Path(home) / ".local/share/scratch-link/scratch-device-manager.expiry"
+        sidecar.unlink(missing_ok=True)
+    out = subprocess.run([sys.executable, '-c', STARTUP_SNIPPET], cwd=HERE, env=env,
+                         capture_output=True, text=True, check=True).stdout.split()
+    return float(out[0]), out[1] == 'True'
+
+
+def bench_startup(home: str, runs: int):
+    run_startup(home, drop_sidecar=True)    # generate the certificate once
+    for label, drop in (('parse PEM', True), ('sidecar  ', False)):
+        times, crypto = [], False
+        for _ in range(runs):
+            elapsed, crypto = run_startup(home, drop)
+            times.append(elapsed)
+        times.sort()
+        print(f"startup {label} | median {times[len(times) // 2] * 1000:7.2f} ms | "
+              f"cryptography imported: {crypto}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Certificate startup benchmark')
+    parser.add_argument('--runs', type=int, default=10, help='Startup runs per variant')
+    args = parser.parse_args()
+
+    # Throwaway home so the real Scratch Link certificate is left alone
+    with tempfile.TemporaryDirectory() as home:
+        print("📊 universal_bridge TLS startup")
+        print("=" * 70)
+        bench_startup(home, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: base64 text frames vs binary frames for the bridge relay paths
+Simulates 100 Hz NXT sensor polling (GETINPUTVALUES request + reply)
+"""
+
+import argparse
+import base64
+import time
+
+# GETINPUTVALUES on port 0 and its 16-byte reply, with the 2-byte BT length header
+REQUEST = bytes([0x03, 0x00, 0x00, 0x07, 0x00])
+REPLY = bytes([0x10, 0x00, 0x02, 0x07, 0x00, 0x00, 0x01, 0x00, 0x05, 0x00,
+               0x00, 0x02, 0x00, 0x02, 0x00, 0x00, 0x00, 0x00])
+
+
+def ws_frame_size(payload_len: int, masked: bool) -> int:
+    """Size of a single WebSocket frame on the wire (RFC 6455)"""
+    if payload_len < 126:
+        header = 2
+    elif payload_len < 65536:
+        header = 4
+    else:
+        header = 10
+    return header + (4 if masked else 0) + payload_len
+
+
+def bridge_roundtrip(binary: bool):
+    """Work the bridge does per poll: decode inbound, encode outbound"""
+    if binary:
+        inbound = REQUEST
+        telegram = bytes(inbound)
+        outbound = REPLY
+    else:
+        inbound = base64.b64encode(REQUEST).decode('ascii')
+        telegram = base64.b64decode(inbound)
+        outbound = base64.b64encode(REPLY).decode('ascii')
+    return telegram, outbound
+
+
+def run(mode: str, rate: float, duration: float, iterations: int):
+    binary = mode == 'binary'
+
+    # CPU per packet, measured over many iterations
+    start = time.process_time()
+    for _ in range(iterations):
+        bridge_roundtrip(binary)
+    cpu_us = (time.process_time() - start) / (iterations * 2) * 1e6
+
+    # Bytes on the wire for the simulated load (client frames are masked)
+    if binary:
+        up, down = len(REQUEST), len(REPLY)
+    else:
+        up = len(base64.b64encode(REQUEST))
+        down = len(base64.b64encode(REPLY))
+    polls = int(rate * duration)
+    wire_up = polls * ws_frame_size(up, masked=True)
+    wire_down = polls * ws_frame_size(down, masked=False)
+
+    print(f"{mode:7s} | {cpu_us:6.2f} µs/packet | "
+          f"payload ↗{up:3d} ↙{down:3d} B | "
+          f"{(wire_up + wire_down) / duration / 1024:6.2f} KiB/s on the wire")
+    return cpu_us, wire_up + wire_down
+
+
+def main():
+    parser = argparse.ArgumentParser(description='WebSocket frame encoding benchmark')
+    parser.add_argument('--rate', type=float, default=100.0, help='Polls per second')
+    parser.add_argument('--duration', type=float, default=60.0, help='Simulated seconds')
+    parser.add_argument('--iterations', type=int, default=200000, help='CPU timing iterations')
+    args = parser.parse_args()
+
+    print(f"📊 {args.rate:.0f} Hz GETINPUTVALUES polling, {args.duration:.0f}s simulated")
+    print("=" * 70)
+    b64_cpu, b64_bytes = run('base64', args.rate, args.duration, args.iterations)
+    bin_cpu, bin_bytes = run('binary', args.rate, args.duration, args.iterations)
+    print("=" * 70)
+    print(f"binary saves {100 * (1 - bin_bytes / b64_bytes):.0f}% bytes, "
+          f"{100 * (1 - bin_cpu / b64_cpu):.0f}% encode/decode CPU")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,7 @@ import queue
 from datetime import datetime
 import ssl
 from pathlib import Path
+from urllib.parse import unquote
 
 # EV3 imports
 from ev3dev2.motor import (
@@ -67,6 +68,14 @@ SSL_KEY = "ev3.key"
 
 VERBOSE = False
 
+# Concurrent request handlers (0 = handle one request at a time)
+MAX_WORKERS = 8
+
+# Persistent HTTP/1.1 connections: idle seconds before the bridge hangs up,
+# and requests served before it asks the client to reconnect
+KEEPALIVE_IDLE = 15
+KEEPALIVE_MAX_REQUESTS = 1000
+
 # Ensure directories exist
 os.makedirs(SCRIPTS_DIR, exist_ok=True)
 os.makedirs(SOUNDS_DIR, exist_ok=True)
@@ -96,6 +105,9 @@ menu_scroll_offset = 0
 # UI Mode
 ui_mode = "status"  # "status" or "scripts"
 
+# Guards lazy creation of motor/sensor objects when requests run in parallel
+hardware_lock = threading.RLock()
+
 # ============================================================================
 # SIGNAL HANDLERS
 # ============================================================================
@@ -720,24 +732,29 @@ def get_motor(port_char):
                 log("Motor {0} disconnected".format(port_char))
                 motors[port_char] = None
 
-    try:
-        mapping = {"A": OUTPUT_A, "B": OUTPUT_B, "C": OUTPUT_C, "D": OUTPUT_D}
+    with hardware_lock:
+        # Another request may have connected it while we waited
+        if motors.get(port_char):
+            return motors[port_char]
 
         try:
-            motors[port_char] = LargeMotor(mapping[port_char])
-            log("Large motor initialized on port {0}".format(port_char))
-        except:
+            mapping = {"A": OUTPUT_A, "B": OUTPUT_B, "C": OUTPUT_C, "D": OUTPUT_D}
+
             try:
-                motors[port_char] = MediumMotor(mapping[port_char])
-                log("Medium motor initialized on port {0}".format(port_char))
+                motors[port_char] = LargeMotor(mapping[port_char])
+                log("Large motor initialized on port {0}".format(port_char))
             except:
-                motors[port_char] = None
-                return None
-    except Exception as e:
-        log("Motor init failed", str(e))
-        motors[port_char] = None
+                try:
+                    motors[port_char] = MediumMotor(mapping[port_char])
+                    log("Medium motor initialized on port {0}".format(port_char))
+                except:
+                    motors[port_char] = None
+                    return None
+        except Exception as e:
+            log("Motor init failed", str(e))
+            motors[port_char] = None
 
-    return motors[port_char]
+        return motors[port_char]
 
 
 def get_medium_motor(port_char):
@@ -791,46 +808,55 @@ def get_dc_motor(port_char):
 def get_sensor(port, sensor_type):
     """Get or create sensor on specified port"""
     key = "{0}_{1}".format(port, sensor_type)
-    if key not in sensors:
-        port_map = {"1": INPUT_1, "2": INPUT_2, "3": INPUT_3, "4": INPUT_4}
-        sensor_classes = {
-            # EV3 sensors
-            "touch": TouchSensor,
-            "color": ColorSensor,
-            "ultrasonic": UltrasonicSensor,
-            "gyro": GyroSensor,
-            "infrared": InfraredSensor,
-            # NXT sensors
-            "sound": SoundSensor,
-            "light": LightSensor,
-        }
-        try:
-            sensors[key] = sensor_classes[sensor_type](port_map[port])
-
-            # Set appropriate mode for sensor
-            sensor = sensors[key]
-            if sensor_type == "touch":
-                sensor.mode = "TOUCH"
-            elif sensor_type == "color":
-                sensor.mode = "COL-REFLECT"  # Default mode
-            elif sensor_type == "ultrasonic":
-                sensor.mode = "US-DIST-CM"
-            elif sensor_type == "gyro":
-                sensor.mode = "GYRO-ANG"
-            elif sensor_type == "infrared":
-                sensor.mode = "IR-PROX"
-            elif sensor_type == "sound":
-                sensor.mode = "DB"  # Decibels mode
-            elif sensor_type == "light":
-                sensor.mode = "REFLECT"  # Reflected light mode
-
-            log("Initialized {0} sensor on port {1}".format(sensor_type, port))
-        except Exception as e:
-            log("Sensor init failed", str(e))
-            sensors[key] = None
+    if key in sensors:
+        return sensors[key]
+    with hardware_lock:
+        if key not in sensors:
+            _init_sensor(key, port, sensor_type)
     return sensors[key]
 
 
+def _init_sensor(key, port, sensor_type):
+    """Create the sensor for key and set its default mode"""
+    port_map = {"1": INPUT_1, "2": INPUT_2, "3": INPUT_3, "4": INPUT_4}
+    sensor_classes = {
+        # EV3 sensors
+        "touch": TouchSensor,
+        "color": ColorSensor,
+        "ultrasonic": UltrasonicSensor,
+        "gyro": GyroSensor,
+        "infrared": InfraredSensor,
+        # NXT sensors
+        "sound": SoundSensor,
+        "light": LightSensor,
+    }
+    try:
+        sensor = sensor_classes[sensor_type](port_map[port])
+
+        # Set appropriate mode for sensor
+        if sensor_type == "touch":
+            sensor.mode = "TOUCH"
+        elif sensor_type == "color":
+            sensor.mode = "COL-REFLECT"  # Default mode
+        elif sensor_type == "ultrasonic":
+            sensor.mode = "US-DIST-CM"
+        elif sensor_type == "gyro":
+            sensor.mode = "GYRO-ANG"
+        elif sensor_type == "infrared":
+            sensor.mode = "IR-PROX"
+        elif sensor_type == "sound":
+            sensor.mode = "DB"  # Decibels mode
+        elif sensor_type == "light":
+            sensor.mode = "REFLECT"  # Reflected light mode
+
+        # Publish only once the mode is set; readers skip the lock
+        sensors[key] = sensor
+        log("Initialized {0} sensor on port {1}".format(sensor_type, port))
+    except Exception as e:
+        log("Sensor init failed", str(e))
+        sensors[key] = None
+
+
 def safe_motor_command(motor, command_func, error_msg="Motor operation failed"):
     """Execute motor command with disconnect protection"""
     if not motor:
@@ -850,6 +876,581 @@ def safe_motor_command(motor, command_func, error_msg="Motor operation failed"):
         return False
 
 
+# ============================================================================
+# READS
+# ============================================================================
+
+
+class AttributeReader:
+    """Reads device attributes, each (device, attribute) at most once
+
+    One reader serves one request, so a batch asking for gyro angle and
+    gyro both costs a single sysfs read of the angle.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def __call__(self, device, name):
+        key = (id(device), name)
+        if key not in self.values:
+            self.values[key] = getattr(device, name)
+        return self.values[key]
+
+
+def read_devices(path):
+    """Name of the device a GET path reads, for read_locks"""
+    parts = path.split("/")
+    if path.startswith("/motor/") and len(parts) > 3:
+        return ["motor:" + parts[3].upper()]
+    if path.startswith("/sensor/") and len(parts) > 3:
+        return ["sensor:" + parts[3]]
+    if path.startswith("/button"):
+        return ["buttons"]
+    if path == "/battery":
+        return ["power"]
+    return []
+
+
+def read_endpoint(path, read=None):
+    """Response payload for a GET read path, or None if the path is unknown
+
+    Holds the port's read lock: ev3dev2 reads each attribute through one
+    cached file with seek(0) + read(), so two threads reading the same
+    port at once can get an empty read, and the NXT sound/light branches
+    set the mode before reading.
+    """
+    held = read_locks.acquire(read_devices(path))
+    try:
+        return _read_endpoint(path, read or AttributeReader())
+    finally:
+        read_locks.release(held)
+
+
+def _read_endpoint(path, read):
+    parts = path.split("/")
+
+    # === BATTERY ===
+    if path == "/battery":
+        voltage = read(power, "measured_volts")
+        current = read(power, "measured_amps")
+        # Approximate percentage (7.4V = 0%, 9.0V = 100%)
+        percentage = max(0, min(100, ((voltage - 7.4) / (9.0 - 7.4)) * 100))
+        vlog(
+            "Battery read",
+            {"voltage": voltage, "percentage": percentage, "current": current},
+        )
+        return {"value": percentage, "voltage": voltage, "current": current}
+
+    # === MOTORS ===
+    elif path.startswith("/motor/position/") or path.startswith("/motor/speed/"):
+        port = parts[-1].upper()
+        attribute = parts[2]
+        m = get_motor(port)
+        if not m:
+            return {"value": 0}
+        try:
+            value = read(m, attribute)
+            vlog("Motor {0} read".format(attribute), {"port": port, attribute: value})
+            return {"value": value}
+        except Exception as e:
+            log("Motor {0} read failed - disconnected".format(attribute), str(e))
+            motors[port] = None
+            return {"value": 0}
+
+    elif path.startswith("/motor/state/"):
+        port = parts[-1].upper()
+        m = get_motor(port)
+        if not m:
+            return {"status": "error", "msg": "Motor not connected"}
+        state = {
+            "position": read(m, "position"),
+            "speed": read(m, "speed"),
+            "is_running": read(m, "is_running"),
+            "is_stalled": read(m, "is_stalled"),
+        }
+        vlog("Motor state read", {"port": port, "state": state})
+        return {"status": "ok", "state": state}
+
+    # === TOUCH SENSOR ===
+    elif path.startswith("/sensor/touch/"):
+        port = parts[-1]
+        sensor = get_sensor(port, "touch")
+        value = read(sensor, "is_pressed") if sensor else False
+        vlog("Touch sensor read", {"port": port, "pressed": value})
+        return {"value": value}
+
+    # === COLOR SENSOR ===
+    elif path.startswith("/sensor/color/"):
+        port = parts[3]
+        mode = parts[4] if len(parts) > 4 else "color"
+
+        sensor = get_sensor(port, "color")
+        if not sensor:
+            return {"value": 0}
+
+        if mode in ("color", "reflected_light_intensity", "ambient_light_intensity"):
+            value = read(sensor, mode)
+        else:
+            value = 0
+
+        vlog("Color sensor read", {"port": port, "mode": mode, "value": value})
+        return {"value": value}
+
+    # === COLOR SENSOR RGB ===
+    elif path.startswith("/sensor/color_rgb/"):
+        port = parts[3]
+        component = parts[4] if len(parts) > 4 else "red"
+
+        sensor = get_sensor(port, "color")
+        if not sensor:
+            return {"value": 0}
+
+        rgb = read(sensor, "rgb")
+        component_map = {"red": 0, "green": 1, "blue": 2}
+        idx = component_map.get(component, 0)
+        value = rgb[idx] if rgb else 0
+
+        vlog("Color RGB read", {"port": port, "component": component, "value": value})
+        return {"value": value}
+
+    # === ULTRASONIC SENSOR ===
+    elif path.startswith("/sensor/ultrasonic/"):
+        port = parts[-1]
+        sensor = get_sensor(port, "ultrasonic")
+        value = read(sensor, "distance_centimeters") if sensor else 0
+        vlog("Ultrasonic sensor read", {"port": port, "distance": value})
+        return {"value": value}
+
+    # === GYRO SENSOR ===
+    elif path.startswith("/sensor/gyro/"):
+        port = parts[3]
+        mode = parts[4] if len(parts) > 4 else "angle"
+
+        sensor = get_sensor(port, "gyro")
+        if not sensor:
+            return {"value": 0 if mode != "both" else {"angle": 0, "rate": 0}}
+
+        if mode in ("angle", "rate"):
+            value = read(sensor, mode)
+        elif mode == "both":
+            value = {"angle": read(sensor, "angle"), "rate": read(sensor, "rate")}
+        else:
+            value = 0
+
+        vlog("Gyro sensor read", {"port": port, "mode": mode, "value": value})
+        return {"value": value}
+
+    # === INFRARED SENSOR ===
+    elif path.startswith("/sensor/infrared/"):
+        port = parts[3]
+        mode = parts[4] if len(parts) > 4 else "proximity"
+
+        sensor = get_sensor(port, "infrared")
+        if not sensor:
+            return {"value": 0}
+
+        if mode == "proximity":
+            value = read(sensor, "proximity")
+        elif mode == "heading":
+            channel = int(parts[5]) if len(parts) > 5 else 1
+            value = sensor.heading(channel)
+        elif mode == "distance":
+            channel = int(parts[5]) if len(parts) > 5 else 1
+            value = sensor.distance(channel) or 0
+        elif mode == "button":
+            channel = int(parts[5]) if len(parts) > 5 else 1
+            button = parts[6] if len(parts) > 6 else "top_left"
+            button_methods = {
+                "top_left": sensor.top_left,
+                "bottom_left": sensor.bottom_left,
+                "top_right": sensor.top_right,
+                "bottom_right": sensor.bottom_right,
+                "beacon": sensor.beacon,
+            }
+            value = button_methods.get(button, lambda ch: False)(channel)
+        else:
+            value = 0
+
+        vlog("Infrared sensor read", {"port": port, "mode": mode, "value": value})
+        return {"value": value}
+
+    # === NXT SOUND SENSOR ===
+    elif path.startswith("/sensor/sound/"):
+        port = parts[3]
+        mode = parts[4] if len(parts) > 4 else "db"  # db or dba
+
+        sensor = get_sensor(port, "sound")
+        if not sensor:
+            return {"value": 0}
+
+        if mode == "db":
+            # Set mode to DB (decibels)
+            sensor.mode = "DB"
+            value = read(sensor, "sound_pressure")
+        elif mode == "dba":
+            # Set mode to DBA (A-weighted decibels)
+            sensor.mode = "DBA"
+            value = read(sensor, "sound_pressure_low")
+        else:
+            value = 0
+
+        vlog("Sound sensor read", {"port": port, "mode": mode, "value": value})
+        return {"value": value}
+
+    # === NXT LIGHT SENSOR ===
+    elif path.startswith("/sensor/light/"):
+        port = parts[3]
+        mode = parts[4] if len(parts) > 4 else "reflect"  # reflect or ambient
+
+        sensor = get_sensor(port, "light")
+        if not sensor:
+            return {"value": 0}
+
+        if mode == "reflect":
+            sensor.mode = "REFLECT"
+            value = read(sensor, "reflected_light_intensity")
+        elif mode == "ambient":
+            sensor.mode = "AMBIENT"
+            value = read(sensor, "ambient_light_intensity")
+        else:
+            value = 0
+
+        vlog("Light sensor read", {"port": port, "mode": mode, "value": value})
+        return {"value": value}
+
+    # === BUTTONS ===
+    elif path.startswith("/button/"):
+        button_name = parts[-1]
+        if button_name in BUTTON_NAMES:
+            pressed = read(buttons, button_name)
+        else:
+            pressed = False
+        vlog("Button read", {"button": button_name, "pressed": pressed})
+        return {"value": pressed}
+
+    elif path == "/buttons/all":
+        all_buttons = {name: read(buttons, name) for name in BUTTON_NAMES}
+        vlog("All buttons read", all_buttons)
+        return {"value": all_buttons}
+
+    return None
+
+
+BUTTON_NAMES = ("up", "down", "left", "right", "enter", "backspace")
+
+
+def payload_value(payload):
+    """Plain value of a read payload (motor state: the state dict)"""
+    if "value" in payload:
+        return payload["value"]
+    return payload.get("state", payload)
+
+
+def read_batch(items):
+    """Read several GET paths at once, sharing attribute reads between them"""
+    read = AttributeReader()
+    values = {}
+    errors = {}
+    for item in items:
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            result = serve_read("/" + item.lstrip("/"), read)
+        except Exception as e:
+            errors[item] = str(e)
+            continue
+        if result is None:
+            errors[item] = "Unknown endpoint"
+        else:
+            values[item] = payload_value(result)
+    response = {"status": "ok", "values": values}
+    if errors:
+        response["errors"] = errors
+    return response
+
+
+# ============================================================================
+# SENSOR SAMPLER
+# ============================================================================
+
+
+class SensorSampler:
+    """Background thread that keeps recently requested reads fresh
+
+    Each GET path that clients poll is registered on first request and
+    then re-read by this thread at about the rate it is being requested
+    (between min_rate and max_rate), until nobody has asked for it for
+    idle_timeout seconds. Handlers answer from the snapshot: a dict that
+    the sampler rebuilds and swaps in whole, so readers never lock. The
+    sampler's own sysfs reads go through read_endpoint and so take the
+    same per-port read locks as the request handlers.
+    """
+
+    def __init__(self, max_rate=20.0, min_rate=1.0, idle_timeout=10.0):
+        self.min_interval = 1.0 / max_rate
+        self.max_interval = 1.0 / min_rate
+        self.idle_timeout = idle_timeout
+        # path -> (payload, monotonic time of the read)
+        self.snapshot = {}
+        # path -> {"last": last request, "period": smoothed request gap, "due": next read}
+        self.wanted = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.samples = 0
+
+    def start(self):
+        thread = threading.Thread(target=self._loop, daemon=True)
+        thread.start()
+        log("Sensor sampler started", {"max_rate": round(1.0 / self.min_interval, 1)})
+
+    def latest(self, path, read=None):
+        """(payload, time read) for path; reads directly if not sampled yet
+
+        A path is only registered for sampling once it has read back a
+        payload, so typos and 404 probes are not re-polled.
+        """
+        now = time.monotonic()
+        entry = self.snapshot.get(path)
+        if entry is None:
+            payload = read_endpoint(path, read)
+            if payload is None:
+                return None, now
+            entry = (payload, now)
+        self._note_request(path, now)
+        return entry
+
+    def read(self, path, read=None):
+        """Payload for path with its age"""
+        payload, taken = self.latest(path, read)
+        if payload is None:
+            return None
+        result = dict(payload)
+        result["age_ms"] = int((time.monotonic() - taken) * 1000)
+        return result
+
+    def _note_request(self, path, now):
+        with self.lock:
+            wanted = self.wanted.get(path)
+            if wanted is None:
+                self.wanted[path] = {"last": now, "period": None, "due": now}
+                self.wake.set()
+            else:
+                # Smoothed gap between requests sets the sampling interval
+                gap = now - wanted["last"]
+                if wanted["period"] is None:
+                    wanted["period"] = gap
+                else:
+                    wanted["period"] = 0.8 * wanted["period"] + 0.2 * gap
+                wanted["last"] = now
+                # Polling sped up: bring the next read forward
+                if wanted["due"] > now + self._interval(wanted):
+                    wanted["due"] = now + self._interval(wanted)
+                    self.wake.set()
+
+    def _interval(self, wanted):
+        period = wanted["period"]
+        if period is None:
+            return self.max_interval
+        return max(self.min_interval, min(self.max_interval, period))
+
+    def _loop(self):
+        while True:
+            now = time.monotonic()
+            with self.lock:
+                for path, wanted in list(self.wanted.items()):
+                    if now - wanted["last"] > self.idle_timeout:
+                        del self.wanted[path]
+                due = [path for path, wanted in self.wanted.items() if wanted["due"] <= now]
+                for path in due:
+                    self.wanted[path]["due"] = now + self._interval(self.wanted[path])
+                next_due = min(
+                    [wanted["due"] for wanted in self.wanted.values()],
+                    default=now + self.max_interval,
+                )
+                keep = set(self.wanted)
+
+            # One reader per pass: shared attributes are read once
+            read = AttributeReader()
+            snapshot = {path: entry for path, entry in self.snapshot.items() if path in keep}
+            for path in due:
+                try:
+                    payload = read_endpoint(path, read)
+                except Exception as e:
+                    vlog("Sample failed", {"path": path, "error": str(e)})
+                    continue
+                if payload is not None:
+                    snapshot[path] = (payload, time.monotonic())
+                    self.samples += 1
+            self.snapshot = snapshot
+
+            self.wake.wait(max(0.0, next_due - time.monotonic()))
+            self.wake.clear()
+
+
+# Opt-in (--sample-rate); None serves every read straight from sysfs
+sampler = None
+
+
+def serve_read(path, read=None):
+    """Read payload for a GET path, from the sampler when it is enabled"""
+    if sampler:
+        return sampler.read(path, read)
+    return read_endpoint(path, read)
+
+
+# ============================================================================
+# SENSOR STREAMS
+# ============================================================================
+
+
+class StreamHub:
+    """One sampling loop feeding every /stream subscriber
+
+    The loop reads the union of all subscribed paths at the fastest
+    subscriber's rate and publishes the values under a sequence number;
+    each subscriber thread picks up the latest values at its own rate and
+    sends only what changed. With --sample-rate the values come from the
+    sampler's snapshot (the loop's polling keeps its paths wanted there),
+    so sysfs is not read twice for the same sensor. Either way every read
+    goes through read_endpoint and its per-port read locks.
+    """
+
+    def __init__(self, max_streams=16):
+        self.max_streams = max_streams
+        self.cond = threading.Condition()
+        self.subscribers = {}
+        self.next_id = 0
+        self.values = {}
+        self.seq = 0
+        self.running = False
+
+    def subscribe(self, paths, interval):
+        """Register a subscriber; None when the stream limit is reached"""
+        with self.cond:
+            if len(self.subscribers) >= self.max_streams:
+                return None
+            self.next_id += 1
+            self.subscribers[self.next_id] = {"paths": set(paths), "interval": interval}
+            if not self.running:
+                self.running = True
+                threading.Thread(target=self._loop, daemon=True).start()
+            return self.next_id
+
+    def unsubscribe(self, stream_id):
+        with self.cond:
+            self.subscribers.pop(stream_id, None)
+
+    def wait(self, seq, timeout):
+        """Latest (seq, values) once newer than seq, or after timeout"""
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq != seq, timeout)
+            return self.seq, self.values
+
+    def _loop(self):
+        while True:
+            with self.cond:
+                if not self.subscribers:
+                    self.running = False
+                    return
+                paths = set()
+                for subscriber in self.subscribers.values():
+                    paths |= subscriber["paths"]
+                interval = min(s["interval"] for s in self.subscribers.values())
+
+            started = time.monotonic()
+            read = AttributeReader()
+            values = {}
+            for path in paths:
+                try:
+                    # Both take the port's read lock while touching sysfs
+                    if sampler:
+                        payload = sampler.latest(path, read)[0]
+                    else:
+                        payload = read_endpoint(path, read)
+                except Exception as e:
+                    vlog("Stream read failed", {"path": path, "error": str(e)})
+                    continue
+                if payload is not None:
+                    values[path] = payload_value(payload)
+
+            with self.cond:
+                self.values = values
+                self.seq += 1
+                self.cond.notify_all()
+
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+stream_hub = StreamHub()
+
+# Subscriber rates (Hz) and the comment line sent when nothing changes
+STREAM_DEFAULT_RATE = 10.0
+STREAM_MAX_RATE = 50.0
+STREAM_HEARTBEAT = 15.0
+
+
+# ============================================================================
+# DEVICE LOCKS
+# ============================================================================
+
+
+class DeviceLocks:
+    """Named locks so two requests never drive the same device at once
+
+    Commands for different motors, the display and the speaker run in
+    parallel. Reads use their own set (read_locks), so polling a motor's
+    position never waits behind a blocking run command on that motor.
+    """
+
+    def __init__(self):
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def acquire(self, names):
+        """Acquire the named locks (in a fixed order) and return them"""
+        held = []
+        for name in sorted(set(names)):
+            with self._guard:
+                lock = self._locks.setdefault(name, threading.Lock())
+            lock.acquire()
+            held.append(lock)
+        return held
+
+    def release(self, held):
+        for lock in reversed(held):
+            lock.release()
+
+
+device_locks = DeviceLocks()
+# Per-port read serialisation (see read_endpoint); different ports in parallel
+read_locks = DeviceLocks()
+
+# Stops must get through while a blocking command holds the motor
+UNLOCKED_COMMANDS = ("motor_stop", "stop_all_motors", "servo_stop", "dc_motor_stop")
+
+
+def command_devices(command, data):
+    """Names of the devices a POST command drives"""
+    if not command or command in UNLOCKED_COMMANDS:
+        return []
+    if command in ("tank_drive", "move_tank", "move_steering"):
+        return [
+            "motor:" + str(data.get("left_port", "B"))[-1:],
+            "motor:" + str(data.get("right_port", "C"))[-1:],
+        ]
+    if "motor" in command or command.startswith("servo_"):
+        return ["motor:" + str(data.get("port", ""))]
+    if command.startswith(("screen_", "draw_")):
+        return ["display"]
+    if command in ("speak", "beep", "simple_beep", "set_volume") or command.startswith("play_"):
+        return ["sound"]
+    if command.startswith("led_") or command == "set_led":
+        return ["leds"]
+    return []
+
+
 # ============================================================================
 # HTTP HANDLER (keep existing + add script management endpoints)
 # ============================================================================
@@ -857,6 +1458,15 @@ def safe_motor_command(motor, command_func, error_msg="Motor operation failed"):
 
 class BridgeHandler(http.server.BaseHTTPRequestHandler):
 
+    # Keep-alive: a poll costs one request, not a TCP (and TLS) handshake
+    protocol_version = "HTTP/1.1"
+    # Idle keep-alive connections are dropped after this many seconds
+    timeout = KEEPALIVE_IDLE
+    # Headers and body go out as separate writes; don't let Nagle hold the body
+    disable_nagle_algorithm = True
+
+    requests_served = 0
+
     def log_message(self, format, *args):
         log(
             "HTTP {0} {1} from {2}".format(
@@ -874,8 +1484,81 @@ class BridgeHandler(http.server.BaseHTTPRequestHandler):
             "Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS"
         )
         self.send_header("Access-Control-Allow-Headers", "*")
+        body = json.dumps(data).encode()
+        self.send_header("Content-Length", str(len(body)))
+        self._end_headers()
+        self.wfile.write(body)
+
+    def _end_headers(self):
+        """End headers, asking the client to reconnect when keep-alive must end"""
+        self.requests_served += 1
+        if (
+            self.requests_served >= KEEPALIVE_MAX_REQUESTS
+            or not getattr(self.server, "keep_alive_ok", lambda: False)()
+        ):
+            self.send_header("Connection", "close")
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
+
+    def _stream(self):
+        """Push changed values of the requested items as Server-Sent Events"""
+        items = []
+        rate = STREAM_DEFAULT_RATE
+        for param in self.path.partition("?")[2].split("&"):
+            if param.startswith("items="):
+                items = [i for i in unquote(param[len("items="):]).split(",") if i]
+            elif param.startswith("rate="):
+                rate = max(0.5, min(STREAM_MAX_RATE, float(param[len("rate="):])))
+        if not items:
+            self._send_json({"status": "error", "msg": "No items"}, 400)
+            return
+
+        # A stream holds its thread; it must not hold a request worker too
+        if not hasattr(self.server, "detach_worker"):
+            self._send_json({"status": "error", "msg": "Streams need --workers > 0"}, 503)
+            return
+        paths = dict(("/" + item.lstrip("/"), item) for item in items)
+        interval = 1.0 / rate
+        stream_id = stream_hub.subscribe(paths, interval)
+        if stream_id is None:
+            self._send_json({"status": "error", "msg": "Too many streams"}, 503)
+            return
+        self.server.detach_worker()
+        log("Stream opened", {"items": len(paths), "rate": rate})
+
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Connection", "close")
+            self.end_headers()
+
+            sent = {}
+            seq = 0
+            last_write = time.monotonic()
+            while True:
+                started = time.monotonic()
+                seq, values = stream_hub.wait(seq, STREAM_HEARTBEAT)
+                delta = {}
+                for path, item in paths.items():
+                    if path in values and (item not in sent or sent[item] != values[path]):
+                        delta[item] = values[path]
+                if delta:
+                    event = "data: " + json.dumps({"values": delta}) + "\n\n"
+                    self.wfile.write(event.encode())
+                    sent.update(delta)
+                    last_write = time.monotonic()
+                elif time.monotonic() - last_write >= STREAM_HEARTBEAT:
+                    self.wfile.write(b": ping\n\n")
+                    last_write = time.monotonic()
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        except (OSError, ValueError):
+            # Client went away
+            pass
+        finally:
+            stream_hub.unsubscribe(stream_id)
+            self.close_connection = True
+            log("Stream closed", {"items": len(paths)})
 
     def do_OPTIONS(self):
         """Handle CORS preflight"""
@@ -885,18 +1568,27 @@ class BridgeHandler(http.server.BaseHTTPRequestHandler):
             "Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS"
         )
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.end_headers()
+        self.send_header("Content-Length", "0")
+        self._end_headers()
 
     def do_POST(self):
         """Handle POST requests"""
         content_length = int(self.headers["Content-Length"])
         post_data = self.rfile.read(content_length)
+        held = []
 
         try:
             data = json.loads(post_data.decode("utf-8"))
+
+            # Batch read: {"items": ["sensor/gyro/2/angle", "motor/position/A"]}
+            if self.path == "/batch":
+                self._send_json(read_batch(data.get("items", [])))
+                return
+
             command = data.get("cmd")
 
             log("Command: {0}".format(command))
+            held = device_locks.acquire(command_devices(command, data))
 
             # === SCRIPT MANAGEMENT ===
             if command == "upload_script":
@@ -1628,6 +2320,8 @@ class BridgeHandler(http.server.BaseHTTPRequestHandler):
             if VERBOSE:
                 traceback.print_exc()
             self._send_json({"status": "error", "msg": str(e)}, 500)
+        finally:
+            device_locks.release(held)
 
     def do_GET(self):
         """Handle GET requests (sensor reads, status etc)"""
@@ -1644,6 +2338,8 @@ class BridgeHandler(http.server.BaseHTTPRequestHandler):
                     "motors": list(motors.keys()),
                     "sensors": list(sensors.keys()),
                 }
+                if sampler:
+                    status["sampled"] = sorted(sampler.snapshot)
                 self._send_json(status)
 
             # List scripts
@@ -1693,272 +2389,26 @@ class BridgeHandler(http.server.BaseHTTPRequestHandler):
                     log("Error fetching logs", str(e))
                     self._send_json({"status": "error", "msg": str(e)}, 500)
 
-            # === BATTERY ===
-            elif self.path == "/battery":
-                voltage = power.measured_volts
-                current = power.measured_amps
-                # Approximate percentage (7.4V = 0%, 9.0V = 100%)
-                percentage = max(0, min(100, ((voltage - 7.4) / (9.0 - 7.4)) * 100))
-                vlog(
-                    "Battery read",
-                    {"voltage": voltage, "percentage": percentage, "current": current},
-                )
-                self._send_json(
-                    {"value": percentage, "voltage": voltage, "current": current}
-                )
-
-            # === MOTORS ===
-            elif self.path.startswith("/motor/position/"):
-                port = self.path.split("/")[-1].upper()
-                m = get_motor(port)
-                if m:
-                    try:
-                        value = m.position
-                        vlog("Motor position read", {"port": port, "position": value})
-                        self._send_json({"value": value})
-                    except Exception as e:
-                        log("Motor position read failed - disconnected", str(e))
-                        motors[port] = None
-                        self._send_json({"value": 0})
-                else:
-                    self._send_json({"value": 0})
-
-            elif self.path.startswith("/motor/speed/"):
-                port = self.path.split("/")[-1].upper()
-                m = get_motor(port)
-                if m:
-                    try:
-                        value = m.speed
-                        vlog("Motor speed read", {"port": port, "speed": value})
-                        self._send_json({"value": value})
-                    except Exception as e:
-                        log("Motor speed read failed - disconnected", str(e))
-                        motors[port] = None
-                        self._send_json({"value": 0})
-                else:
-                    self._send_json({"value": 0})
-
-            elif self.path.startswith("/motor/state/"):
-                port = self.path.split("/")[-1].upper()
-                m = get_motor(port)
-                if m:
-                    state = {
-                        "position": m.position,
-                        "speed": m.speed,
-                        "is_running": m.is_running,
-                        "is_stalled": m.is_stalled,
-                    }
-                    vlog("Motor state read", {"port": port, "state": state})
-                    self._send_json({"status": "ok", "state": state})
-                else:
-                    self._send_json({"status": "error", "msg": "Motor not connected"})
-
-            # === TOUCH SENSOR ===
-            elif self.path.startswith("/sensor/touch/"):
-                port = self.path.split("/")[-1]
-                sensor = get_sensor(port, "touch")
-                value = sensor.is_pressed if sensor else False
-                vlog("Touch sensor read", {"port": port, "pressed": value})
-                self._send_json({"value": value})
-
-            # === COLOR SENSOR ===
-            elif self.path.startswith("/sensor/color/"):
-                parts = self.path.split("/")
-                port = parts[3]
-                mode = parts[4] if len(parts) > 4 else "color"
-
-                sensor = get_sensor(port, "color")
-
-                if not sensor:
-                    self._send_json({"value": 0})
-                    return
-
-                if mode == "color":
-                    value = sensor.color
-                elif mode == "reflected_light_intensity":
-                    value = sensor.reflected_light_intensity
-                elif mode == "ambient_light_intensity":
-                    value = sensor.ambient_light_intensity
-                else:
-                    value = 0
-
-                vlog("Color sensor read", {"port": port, "mode": mode, "value": value})
-                self._send_json({"value": value})
-
-            # === COLOR SENSOR RGB ===
-            elif self.path.startswith("/sensor/color_rgb/"):
-                parts = self.path.split("/")
-                port = parts[3]
-                component = parts[4] if len(parts) > 4 else "red"
-
-                sensor = get_sensor(port, "color")
-
-                if not sensor:
-                    self._send_json({"value": 0})
-                    return
-
-                rgb = sensor.rgb
-                component_map = {"red": 0, "green": 1, "blue": 2}
-                idx = component_map.get(component, 0)
-                value = rgb[idx] if rgb else 0
-
-                vlog(
-                    "Color RGB read",
-                    {"port": port, "component": component, "value": value},
-                )
-                self._send_json({"value": value})
-
-            # === ULTRASONIC SENSOR ===
-            elif self.path.startswith("/sensor/ultrasonic/"):
-                port = self.path.split("/")[-1]
-                sensor = get_sensor(port, "ultrasonic")
-                value = sensor.distance_centimeters if sensor else 0
-                vlog("Ultrasonic sensor read", {"port": port, "distance": value})
-                self._send_json({"value": value})
-
-            # === GYRO SENSOR ===
-            elif self.path.startswith("/sensor/gyro/"):
-                parts = self.path.split("/")
-                port = parts[3]
-                mode = parts[4] if len(parts) > 4 else "angle"
-
-                sensor = get_sensor(port, "gyro")
-
-                if not sensor:
-                    value = 0 if mode != "both" else {"angle": 0, "rate": 0}
-                    self._send_json({"value": value})
-                    return
-
-                if mode == "angle":
-                    value = sensor.angle
-                elif mode == "rate":
-                    value = sensor.rate
-                elif mode == "both":
-                    value = {"angle": sensor.angle, "rate": sensor.rate}
-                else:
-                    value = 0 if mode != "both" else {"angle": 0, "rate": 0}
-
-                vlog("Gyro sensor read", {"port": port, "mode": mode, "value": value})
-                self._send_json({"value": value})
-
-            # === INFRARED SENSOR ===
-            elif self.path.startswith("/sensor/infrared/"):
-                parts = self.path.split("/")
-                port = parts[3]
-                mode = parts[4] if len(parts) > 4 else "proximity"
-
-                sensor = get_sensor(port, "infrared")
-
-                if not sensor:
-                    self._send_json({"value": 0})
-                    return
-
-                if mode == "proximity":
-                    value = sensor.proximity
-                elif mode == "heading":
-                    channel = int(parts[5]) if len(parts) > 5 else 1
-                    value = sensor.heading(channel)
-                elif mode == "distance":
-                    channel = int(parts[5]) if len(parts) > 5 else 1
-                    value = sensor.distance(channel) or 0
-                elif mode == "button":
-                    channel = int(parts[5]) if len(parts) > 5 else 1
-                    button = parts[6] if len(parts) > 6 else "top_left"
-                    button_methods = {
-                        "top_left": sensor.top_left,
-                        "bottom_left": sensor.bottom_left,
-                        "top_right": sensor.top_right,
-                        "bottom_right": sensor.bottom_right,
-                        "beacon": sensor.beacon,
-                    }
-                    value = button_methods.get(button, lambda ch: False)(channel)
-                else:
-                    value = 0
-
-                vlog(
-                    "Infrared sensor read", {"port": port, "mode": mode, "value": value}
-                )
-                self._send_json({"value": value})
-
-            # === NXT SOUND SENSOR ===
-            elif self.path.startswith("/sensor/sound/"):
-                parts = self.path.split("/")
-                port = parts[3]
-                mode = parts[4] if len(parts) > 4 else "db"  # db or dba
-
-                sensor = get_sensor(port, "sound") 
-
-                if not sensor:
-                    self._send_json({"value": 0})
-                    return
-
-                if mode == "db":
-                    # Set mode to DB (decibels)
-                    sensor.mode = "DB"
-                    value = sensor.sound_pressure
-                elif mode == "dba":
-                    # Set mode to DBA (A-weighted decibels)
-                    sensor.mode = "DBA"
-                    value = sensor.sound_pressure_low
-                else:
-                    value = 0
-
-                vlog("Sound sensor read", {"port": port, "mode": mode, "value": value})
-                self._send_json({"value": value})
-
-            # === NXT LIGHT SENSOR ===
-            elif self.path.startswith("/sensor/light/"):
-                parts = self.path.split("/")
-                port = parts[3]
-                mode = parts[4] if len(parts) > 4 else "reflect"  # reflect or ambient
+            # Server-Sent Events: /stream?items=sensor/gyro/2/angle,motor/position/A&rate=10
+            elif self.path.startswith("/stream"):
+                self._stream()
 
-                sensor = get_sensor(port, "light")
-
-                if not sensor:
-                    self._send_json({"value": 0})
-                    return
-
-                if mode == "reflect":
-                    sensor.mode = "REFLECT"
-                    value = sensor.reflected_light_intensity
-                elif mode == "ambient":
-                    sensor.mode = "AMBIENT"
-                    value = sensor.ambient_light_intensity
-                else:
-                    value = 0
-
-                vlog("Light sensor read", {"port": port, "mode": mode, "value": value})
-                self._send_json({"value": value})
-
-            # === BUTTONS ===
-            elif self.path.startswith("/button/"):
-                button_name = self.path.split("/")[-1]
-                button_map = {
-                    "up": buttons.up,
-                    "down": buttons.down,
-                    "left": buttons.left,
-                    "right": buttons.right,
-                    "enter": buttons.enter,
-                    "backspace": buttons.backspace,
-                }
-                pressed = button_map.get(button_name, False)
-                vlog("Button read", {"button": button_name, "pressed": pressed})
-                self._send_json({"value": pressed})
-
-            elif self.path == "/buttons/all":
-                all_buttons = {
-                    "up": buttons.up,
-                    "down": buttons.down,
-                    "left": buttons.left,
-                    "right": buttons.right,
-                    "enter": buttons.enter,
-                    "backspace": buttons.backspace,
-                }
-                vlog("All buttons read", all_buttons)
-                self._send_json({"value": all_buttons})
+            # Batch read: /snapshot?items=sensor/gyro/2/angle,motor/position/A
+            elif self.path.startswith("/snapshot"):
+                query = self.path.partition("?")[2]
+                items = []
+                for param in query.split("&"):
+                    if param.startswith("items="):
+                        items = unquote(param[len("items="):]).split(",")
+                self._send_json(read_batch(items))
 
+            # Battery, motors, sensors, buttons
             else:
-                self._send_json({"status": "error", "msg": "Unknown endpoint"}, 404)
+                result = serve_read(self.path)
+                if result is None:
+                    self._send_json({"status": "error", "msg": "Unknown endpoint"}, 404)
+                else:
+                    self._send_json(result)
 
         except Exception as e:
             log("Error processing GET", str(e))
@@ -2098,6 +2548,7 @@ def ui_loop():
 
         # Update display
         if current_time - last_update >= update_interval:
+            held = device_locks.acquire(["display"])
             try:
                 if ui_mode == "status":
                     draw_status_screen()
@@ -2107,6 +2558,8 @@ def ui_loop():
                 last_update = current_time
             except Exception as e:
                 log("UI draw error", str(e))
+            finally:
+                device_locks.release(held)
 
         # Handle button presses
         try:
@@ -2232,11 +2685,68 @@ def generate_self_signed_cert(cert_file="ev3.crt", key_file="ev3.key"):
         return False
 
 
+class BridgeServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """Thread-per-request server with at most max_workers requests in flight
+
+    When all workers are busy the accept loop waits for a free slot, so a
+    burst of clients cannot spawn unbounded threads on the EV3.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, server_address, handler_class, max_workers=8):
+        self.slots = threading.BoundedSemaphore(max_workers)
+        self.max_workers = max_workers
+        self.active = 0
+        self.active_lock = threading.Lock()
+        self.detached = threading.local()
+        socketserver.TCPServer.__init__(self, server_address, handler_class)
+
+    def detach_worker(self):
+        """Give up the calling thread's worker slot (for long-lived streams)"""
+        self.detached.flag = True
+        self._release_slot()
+
+    def keep_alive_ok(self):
+        """A kept-alive connection holds a worker; release it when all are busy"""
+        return self.active < self.max_workers
+
+    def process_request(self, request, client_address):
+        self.slots.acquire()
+        with self.active_lock:
+            self.active += 1
+        try:
+            socketserver.ThreadingMixIn.process_request(self, request, client_address)
+        except:
+            self._release_slot()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            socketserver.ThreadingMixIn.process_request_thread(
+                self, request, client_address
+            )
+        finally:
+            if getattr(self.detached, "flag", False):
+                self.detached.flag = False
+            else:
+                self._release_slot()
+
+    def _release_slot(self):
+        with self.active_lock:
+            self.active -= 1
+        self.slots.release()
+
+
 def run_server():
     """Start HTTP server"""
-    socketserver.TCPServer.allow_reuse_address = True
-    server = socketserver.TCPServer(("", PORT), BridgeHandler)
-    server.allow_reuse_address = True
+    if MAX_WORKERS > 0:
+        server = BridgeServer(("", PORT), BridgeHandler, MAX_WORKERS)
+    else:
+        socketserver.TCPServer.allow_reuse_address = True
+        server = socketserver.TCPServer(("", PORT), BridgeHandler)
+        server.allow_reuse_address = True
 
     if USE_SSL:
         if not generate_self_signed_cert(SSL_CERT, SSL_KEY):
@@ -2245,12 +2755,16 @@ def run_server():
 
         context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
         context.load_cert_chain(SSL_CERT, SSL_KEY)
-        server.socket = context.wrap_socket(server.socket, server_side=True)
+        # Handshake on the worker thread, not in the accept loop
+        server.socket = context.wrap_socket(
+            server.socket, server_side=True, do_handshake_on_connect=MAX_WORKERS == 0
+        )
 
     log("=" * 50)
     log("EV3 Bridge Server v2.3 Started")
     log("Protocol: {0}".format("HTTPS" if USE_SSL else "HTTP"))
     log("Port: {0}".format(PORT))
+    log("Workers: {0}".format(MAX_WORKERS or "single-threaded"))
     log("=" * 50)
 
     server.serve_forever()
@@ -2262,7 +2776,7 @@ def run_server():
 
 
 def main():
-    global VERBOSE, PORT, USE_SSL, SSL_CERT, SSL_KEY
+    global VERBOSE, PORT, USE_SSL, SSL_CERT, SSL_KEY, MAX_WORKERS, sampler
 
     parser = argparse.ArgumentParser(description="EV3 Bridge Server v2.3")
     parser.add_argument("--port", type=int, default=8080)
@@ -2271,6 +2785,25 @@ def main():
     parser.add_argument("--ssl", "--https", action="store_true")
     parser.add_argument("--cert", type=str, default="ev3.crt")
     parser.add_argument("--key", type=str, default="ev3.key")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Requests handled in parallel (0 = one at a time)",
+    )
+    parser.add_argument(
+        "--keepalive-idle",
+        type=float,
+        default=KEEPALIVE_IDLE,
+        help="Seconds an idle HTTP/1.1 connection is kept open (0 = HTTP/1.0)",
+    )
+    parser.add_argument(
+        "--sample-rate",
+        type=float,
+        default=0,
+        help="Serve reads from a background sampler polling at up to this "
+        "many Hz (0 = read on every request)",
+    )
 
     args = parser.parse_args()
 
@@ -2279,6 +2812,11 @@ def main():
     USE_SSL = args.ssl
     SSL_CERT = args.cert
     SSL_KEY = args.key
+    MAX_WORKERS = max(0, args.workers)
+    if args.keepalive_idle > 0:
+        BridgeHandler.timeout = args.keepalive_idle
+    else:
+        BridgeHandler.protocol_version = "HTTP/1.0"
 
     if USE_SSL and args.port == 8080:
         PORT = 8443
@@ -2296,6 +2834,10 @@ def main():
     scanner_thread = threading.Thread(target=script_scanner, daemon=True)
     scanner_thread.start()
 
+    if args.sample_rate > 0:
+        sampler = SensorSampler(max_rate=args.sample_rate)
+        sampler.start()
+
     # Start server thread
     server_thread = threading.Thread(target=run_server, daemon=True)
     server_thread.start()
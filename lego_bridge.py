@@ -11,10 +11,13 @@ import base64
 import json
 import sys
 import time
+import threading
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 import os
 import glob
+from collections import deque
+from urllib.parse import urlparse, parse_qs
 
 # BLE support for Boost
 try:
@@ -35,26 +38,45 @@ CONFIG = {
         'com_port': os.getenv('NXT_PORT', '/dev/cu.NXT'),
         'baudrate': 115200,
         'poll_timeout': 5.0,
-        'poll_interval': 0.01
+        'client_queue_size': 64,
+        'slow_client_policy': 'drop_oldest',  # or 'drop_newest'
+        'max_inflight': 4,       # reply-expecting commands per client
+        'reply_timeout': 1.0,    # counted from when the telegram is written
+        'late_reply_grace': 5.0, # how long a timed-out request still claims its reply
+        'min_watch_interval': 0.01
     },
     'spike': {
         'port': 8081,
         'com_port': os.getenv('SPIKE_PORT', '/dev/cu.LEGOHub'),
-        'baudrate': 115200
+        'baudrate': 115200,
+        'raw_chunk_size': 256,   # fallback when raw-paste is unsupported
+        'reply_timeout': 2.0,    # per hub reply during an upload (SPP can lag)
+        'run_timeout': 5.0       # how long an upload waits for program output
     },
     'boost': {
         'port': 8082,
         'ble_service': '00001623-1212-efde-1623-785feabcd123',
-        'ble_characteristic': '00001624-1212-efde-1623-785feabcd123'
+        'ble_characteristic': '00001624-1212-efde-1623-785feabcd123',
+        'client_queue_size': 256,
+        'max_batch': 16,         # notifications per frame for ?batch=1 clients
+        'write_mode': 'auto',    # 'auto', 'response' or 'no_response'
+        'write_queue_size': 16,  # queued commands before write() makes the client wait
+        'batch_writes': False    # pack queued commands into one sub-MTU write
     }
 }
 
 DEBUG = True
 
+# Clients that negotiate this sub-protocol (or connect with ?binary=1)
+# exchange raw telegrams in binary frames instead of base64 text frames
+BINARY_SUBPROTOCOL = 'lego-binary'
+
 stats = {
-    'nxt': {'to_hub': 0, 'from_hub': 0, 'errors': 0},
+    'nxt': {'to_hub': 0, 'from_hub': 0, 'errors': 0, 'dropped': 0, 'coalesced': 0,
+            'timeouts': 0, 'late_replies': 0, 'rtt_ms': {}, 'inflight': {}},
     'spike': {'to_hub': 0, 'from_hub': 0, 'errors': 0},
-    'boost': {'to_hub': 0, 'from_hub': 0, 'errors': 0},
+    'boost': {'to_hub': 0, 'from_hub': 0, 'errors': 0, 'dropped': 0, 'queue_peak': 0,
+              'commands': 0, 'gatt_writes': 0, 'write_time': 0.0},
     'start_time': None
 }
 
@@ -114,6 +136,19 @@ NXT_OPCODE_NAMES = {
     0x95: 'WRITE_IO_MAP'
 }
 
+# Command types that make the brick send a REPLY (0x02) echoing the opcode
+NXT_REPLY_EXPECTED = (0x00, 0x01)
+NXT_REPLY = 0x02
+
+NXT_DIRECT_CMD_NO_REPLY = 0x80
+NXT_SET_OUT_STATE = 0x04
+
+# Values the bridge can poll on behalf of clients ("watch" control messages)
+NXT_WATCH_OPCODES = {
+    'input': 0x07,   # GETINPUTVALUES
+    'output': 0x06   # GETOUTPUTSTATE
+}
+
 NXT_ERROR_CODES = {
     0x00: 'Success',
     0x20: 'Pending communication transaction in progress',
@@ -379,6 +414,52 @@ def log_message(hub_type: str, direction: str, data: Any, description: str = "")
     
     print(f"{color}{log_line}\033[0m")
 
+def query_flag(websocket, name: str) -> bool:
+    """Check a boolean ?name=1 flag in the WebSocket request path"""
+    request = getattr(websocket, 'request', None)
+    path = request.path if request is not None else getattr(websocket, 'path', '')
+    return parse_qs(urlparse(path or '').query).get(name, ['0'])[0] in ('1', 'true')
+
+def select_binary_subprotocol(connection, offered):
+    """Pick the binary sub-protocol if offered; clients offering none still connect"""
+    return BINARY_SUBPROTOCOL if BINARY_SUBPROTOCOL in offered else None
+
+def wants_binary(websocket) -> bool:
+    """Check whether the client negotiated binary frames"""
+    if getattr(websocket, 'subprotocol', None) == BINARY_SUBPROTOCOL:
+        return True
+    return query_flag(websocket, 'binary')
+
+def encode_frame(data: bytes, binary: bool):
+    """Encode a packet for the WebSocket (raw bytes or base64 text)"""
+    if binary:
+        return data
+    return base64.b64encode(data).decode('ascii')
+
+def decode_frame(message) -> bytes:
+    """Decode a WebSocket message; binary frames are already raw"""
+    if isinstance(message, (bytes, bytearray)):
+        return bytes(message)
+    return base64.b64decode(message)
+
+RTT_BUCKETS_MS = (5, 10, 20, 50, 100, 200, 500, 1000)
+DEPTH_BUCKETS = (1, 2, 4, 8, 16)
+
+def histogram_add(hist: Dict[str, int], value: float, buckets: tuple):
+    """Count value in the first bucket it fits (bucket labels are upper bounds)"""
+    for bound in buckets:
+        if value <= bound:
+            key = f"≤{bound}"
+            break
+    else:
+        key = f">{buckets[-1]}"
+    hist[key] = hist.get(key, 0) + 1
+
+def format_histogram(hist: Dict[str, int], buckets: tuple) -> str:
+    """Format histogram counts in bucket order"""
+    keys = [f"≤{bound}" for bound in buckets] + [f">{buckets[-1]}"]
+    return " ".join(f"{key}:{hist[key]}" for key in keys if key in hist)
+
 def print_stats():
     """Print accumulated statistics"""
     if not DEBUG or stats['start_time'] is None:
@@ -394,6 +475,19 @@ def print_stats():
         if total > 0:
             rate = total / elapsed if elapsed > 0 else 0
             print(f"   {hub_type.upper():6s}: ↗ {hub_stats['to_hub']:4d} ↙ {hub_stats['from_hub']:4d} ❌ {hub_stats['errors']:3d} | {rate:.1f} msg/sec")
+            if hub_stats.get('dropped'):
+                print(f"   {'':6s}  🗑  {hub_stats['dropped']} dropped for slow clients")
+            if hub_stats.get('queue_peak'):
+                print(f"   {'':6s}  📥 peak notification queue depth {hub_stats['queue_peak']}")
+            if hub_stats.get('write_time'):
+                print(f"   {'':6s}  ⚡ {hub_stats['commands'] / hub_stats['write_time']:.0f} cmds/sec achieved"
+                      f" ({hub_stats['commands']} cmds in {hub_stats['gatt_writes']} GATT writes)")
+            if hub_stats.get('coalesced'):
+                print(f"   {'':6s}  🔀 {hub_stats['coalesced']} motor commands coalesced")
+            if hub_stats.get('rtt_ms'):
+                print(f"   {'':6s}  ⏱  RTT ms  {format_histogram(hub_stats['rtt_ms'], RTT_BUCKETS_MS)}"
+                      f" | timeouts {hub_stats['timeouts']} | late {hub_stats['late_replies']}")
+                print(f"   {'':6s}  📥 in-flight {format_histogram(hub_stats['inflight'], DEPTH_BUCKETS)}")
 
 def auto_detect_serial_port(hub_type: str) -> Optional[str]:
     """Auto-detect serial port for hub type"""
@@ -409,6 +503,49 @@ def auto_detect_serial_port(hub_type: str) -> Optional[str]:
     
     return None
 
+# ============================================================================
+# NXT TELEGRAM FRAMING
+# ============================================================================
+
+NXT_MAX_TELEGRAM = 256
+
+class NXTFramer:
+    """Incremental framer for length-prefixed NXT telegrams
+
+    Bytes are fed in whatever chunks the serial port delivers them; every
+    complete telegram (2-byte little-endian length header + payload) is
+    returned as soon as its last byte arrives.
+    """
+    
+    def __init__(self):
+        self.buffer = bytearray()
+    
+    def feed(self, data: bytes) -> List[bytes]:
+        """Append data and return all complete telegrams"""
+        self.buffer += data
+        packets = []
+        
+        while len(self.buffer) >= 2:
+            length = self.buffer[0] | (self.buffer[1] << 8)
+            
+            if length > NXT_MAX_TELEGRAM or length == 0:
+                if DEBUG:
+                    print(f"⚠️ [NXT] Invalid length: {length}")
+                del self.buffer[:2]
+                continue
+            
+            if len(self.buffer) < length + 2:
+                break
+            
+            packets.append(bytes(self.buffer[:length + 2]))
+            del self.buffer[:length + 2]
+        
+        return packets
+    
+    def reset(self):
+        """Discard any partial telegram"""
+        self.buffer.clear()
+
 # ============================================================================
 # NXT CONNECTION HANDLER
 # ============================================================================
@@ -420,6 +557,11 @@ class NXTConnection:
         self.port_name = port_name
         self.ser = None
         self.connected = False
+        self.framer = NXTFramer()
+        self.packets: Optional[asyncio.Queue] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.reader_thread: Optional[threading.Thread] = None
+        self.write_lock = threading.Lock()
         
     def connect(self) -> bool:
         """Open serial connection"""
@@ -431,6 +573,10 @@ class NXTConnection:
             )
             self.connected = True
             print(f"✅ [NXT] Connected to {self.port_name}")
+            
+            # Restart the reader after a reconnect
+            if self.loop is not None:
+                self.start_reader(self.loop)
             return True
         except Exception as e:
             print(f"❌ [NXT] Connection failed: {e}")
@@ -440,53 +586,43 @@ class NXTConnection:
         """Check if connection is alive"""
         return self.connected and self.ser and self.ser.is_open
     
-    def read_packet_polling(self) -> Optional[bytes]:
-        """Read NXT packet with polling (matches original implementation exactly)"""
-        try:
-            start_time = time.time()
-            timeout = CONFIG['nxt']['poll_timeout']
-            
-            # Wait for header (2 bytes)
-            while time.time() - start_time < timeout:
-                if self.ser.in_waiting >= 2:
-                    break
-                time.sleep(CONFIG['nxt']['poll_interval'])
-            
-            if self.ser.in_waiting < 2:
-                return None  # Timeout, no data
-            
-            # Read header
-            header = self.ser.read(2)
-            if len(header) < 2:
-                return None
-            
-            length = header[0] | (header[1] << 8)
-            
-            if length > 256 or length == 0:
-                if DEBUG:
-                    print(f"⚠️ [NXT] Invalid length: {length}")
-                return None
-            
-            # Wait for payload
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                if self.ser.in_waiting >= length:
-                    break
-                time.sleep(CONFIG['nxt']['poll_interval'])
-            
-            # Read data
-            data = self.ser.read(length)
-            
-            if len(data) < length:
-                if DEBUG:
-                    print(f"⚠️ [NXT] Incomplete: got {len(data)}/{length}")
-                return None
+    def start_reader(self, loop: asyncio.AbstractEventLoop):
+        """Start the background reader thread (idempotent)"""
+        self.loop = loop
+        if self.packets is None:
+            self.packets = asyncio.Queue()
+        
+        if self.reader_thread and self.reader_thread.is_alive():
+            return
+        
+        self.framer.reset()
+        self.reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
+        self.reader_thread.start()
+    
+    def _reader_loop(self):
+        """Blocking serial reads feeding the framer; telegrams go to the event loop"""
+        ser = self.ser
+        while self.connected and ser is self.ser and ser.is_open:
+            try:
+                # Blocks in the driver until data arrives (or the 0.1 s port timeout)
+                chunk = ser.read(ser.in_waiting or 1)
+            except Exception as e:
+                if self.connected and DEBUG:
+                    print(f"⚠️ [NXT] Read error: {e}")
+                self.connected = False
+                break
             
-            return header + data
+            if not chunk:
+                continue
             
-        except Exception as e:
-            if DEBUG:
-                print(f"⚠️ [NXT] Read error: {e}")
+            for packet in self.framer.feed(chunk):
+                self.loop.call_soon_threadsafe(self.packets.put_nowait, packet)
+    
+    async def read_packet(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Wait for the next complete telegram, or None on timeout"""
+        try:
+            return await asyncio.wait_for(self.packets.get(), timeout)
+        except asyncio.TimeoutError:
             return None
     
     def write(self, data: bytes) -> bool:
@@ -497,8 +633,10 @@ class NXTConnection:
         max_retries = 3
         for retry_count in range(max_retries):
             try:
-                self.ser.write(data)
-                self.ser.flush()
+                # Several clients share the port; keep telegrams whole
+                with self.write_lock:
+                    self.ser.write(data)
+                    self.ser.flush()
                 return True
             except Exception as e:
                 stats['nxt']['errors'] += 1
@@ -523,10 +661,363 @@ class NXTConnection:
             except:
                 pass
 
+# ============================================================================
+# NXT OUTBOUND SCHEDULER
+# ============================================================================
+
+def nxt_coalesce_key(telegram: bytes) -> Optional[int]:
+    """Motor port of a no-reply SETOUTPUTSTATE, the only telegrams we coalesce"""
+    if (len(telegram) >= 5 and telegram[2] == NXT_DIRECT_CMD_NO_REPLY
+            and telegram[3] == NXT_SET_OUT_STATE):
+        return telegram[4]
+    return None
+
+class NXTOutbound:
+    """Outbound telegram queue with last-write-wins for motor commands
+
+    Telegrams are written one at a time by a single task. While the slow
+    Bluetooth link is busy, a newer no-reply SETOUTPUTSTATE replaces the
+    queued, unsent one for the same port (the new one goes to the back of
+    the queue, so nothing overtakes a command received before it). All
+    other telegrams, in particular reply-expecting ones, keep their order.
+    """
+    
+    def __init__(self, nxt: NXTConnection):
+        self.nxt = nxt
+        self.queue: deque = deque()
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+    
+    def put(self, telegram: bytes, on_fail=None, on_sent=None):
+        """Queue a telegram; on_sent() or on_fail() is called once it is written"""
+        key = nxt_coalesce_key(telegram)
+        if key is not None:
+            for index, (queued_key, _, _, _) in enumerate(self.queue):
+                if queued_key == key:
+                    del self.queue[index]
+                    stats['nxt']['coalesced'] += 1
+                    break
+        
+        self.queue.append((key, telegram, on_fail, on_sent))
+        self.wakeup.set()
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.queue:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            
+            _, telegram, on_fail, on_sent = self.queue.popleft()
+            ok = await loop.run_in_executor(None, self.nxt.write, telegram)
+            if not ok:
+                stats['nxt']['errors'] += 1
+                if on_fail:
+                    on_fail()
+            elif on_sent:
+                on_sent()
+
+# ============================================================================
+# NXT CLIENT FAN-OUT
+# ============================================================================
+
+class NXTClient:
+    """One WebSocket subscriber of an NXTHub with a bounded outbound queue"""
+    
+    def __init__(self, websocket, maxsize: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.inflight = asyncio.Semaphore(CONFIG['nxt']['max_inflight'])
+        self.dropped = 0
+    
+    def offer(self, packet: bytes):
+        """Queue a telegram without ever blocking the hub"""
+        if self.queue.full():
+            self.dropped += 1
+            stats['nxt']['dropped'] += 1
+            if CONFIG['nxt']['slow_client_policy'] == 'drop_newest':
+                return
+            # drop_oldest: keep the freshest sensor replies
+            self.queue.get_nowait()
+        self.queue.put_nowait(packet)
+
+class NXTPendingRequest:
+    """A reply-expecting command waiting for its REPLY telegram"""
+    
+    def __init__(self, client: NXTClient, opcode: int):
+        self.client = client
+        self.opcode = opcode
+        self.sent_at: Optional[float] = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+        # Timed out but kept in the FIFO so its late reply is not misrouted
+        self.expired = False
+
+class NXTWatch:
+    """Bridge-side poll loop for one value, shared by every client watching it
+
+    The loop runs next to the serial link at the fastest interval any
+    subscriber asked for and pushes the reply telegram to subscribers
+    only when it differs from the previous one.
+    """
+    
+    def __init__(self, hub: 'NXTHub', kind: str, port: int):
+        self.hub = hub
+        self.kind = kind
+        self.port = port
+        self.subscribers: Dict[NXTClient, float] = {}
+        self.poller = NXTClient(None, 1)
+        self.last: Optional[bytes] = None
+        self.task: Optional[asyncio.Task] = None
+    
+    @property
+    def interval(self) -> float:
+        return min(self.subscribers.values())
+    
+    def add(self, client: NXTClient, interval: float):
+        self.subscribers[client] = max(interval, CONFIG['nxt']['min_watch_interval'])
+        if self.last:
+            client.offer(self.last)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+    
+    def remove(self, client: NXTClient):
+        self.subscribers.pop(client, None)
+        if not self.subscribers and self.task:
+            self.task.cancel()
+    
+    async def _run(self):
+        request = bytes([0x03, 0x00, 0x00, NXT_WATCH_OPCODES[self.kind], self.port])
+        while self.subscribers:
+            started = time.monotonic()
+            try:
+                if self.hub.nxt.is_alive() and await self.hub.send(self.poller, request):
+                    reply = await asyncio.wait_for(
+                        self.poller.queue.get(), CONFIG['nxt']['reply_timeout']
+                    )
+                    if reply != self.last:
+                        self.last = reply
+                        for client in list(self.subscribers):
+                            client.offer(reply)
+            except asyncio.TimeoutError:
+                pass
+            except Exception as e:
+                stats['nxt']['errors'] += 1
+                if DEBUG:
+                    print(f"⚠️ [NXT] Watch {self.kind}:{self.port} error: {e}")
+            
+            await asyncio.sleep(max(0, self.interval - (time.monotonic() - started)))
+
+class NXTHub:
+    """Single reader per NXTConnection broadcasting telegrams to all clients
+
+    Replies to commands sent with the reply flag are routed back to the
+    client that sent them: the brick answers in order and echoes the
+    opcode, so the oldest outstanding request with that opcode owns the
+    reply. A request that times out stays in the FIFO as a tombstone for
+    late_reply_grace seconds and swallows its late reply. Everything else
+    (unsolicited replies) is broadcast.
+    """
+    
+    def __init__(self, nxt: NXTConnection):
+        self.nxt = nxt
+        self.clients: set = set()
+        self.reader_task: Optional[asyncio.Task] = None
+        self.pending: deque = deque()
+        self.outbound = NXTOutbound(nxt)
+        self.watches: Dict[tuple, NXTWatch] = {}
+    
+    def start(self):
+        """Start the hub reader task (idempotent)"""
+        if self.reader_task is None or self.reader_task.done():
+            self.reader_task = asyncio.create_task(self._reader())
+    
+    def subscribe(self, websocket) -> NXTClient:
+        client = NXTClient(websocket, CONFIG['nxt']['client_queue_size'])
+        self.clients.add(client)
+        self.start()
+        return client
+    
+    def unsubscribe(self, client: NXTClient):
+        self.clients.discard(client)
+        for watch in list(self.watches.values()):
+            self.unwatch(client, watch.kind, watch.port)
+    
+    def watch(self, client: NXTClient, kind: str, port: int, interval: float):
+        """Subscribe a client to a value polled by the bridge"""
+        key = (kind, port)
+        if key not in self.watches:
+            self.watches[key] = NXTWatch(self, kind, port)
+        self.watches[key].add(client, interval)
+    
+    def unwatch(self, client: NXTClient, kind: str, port: int):
+        watch = self.watches.get((kind, port))
+        if watch:
+            watch.remove(client)
+            if not watch.subscribers:
+                del self.watches[(kind, port)]
+    
+    async def _reader(self):
+        """Read telegrams from the NXT and fan them out"""
+        consecutive_failures = 0
+        while True:
+            try:
+                if not self.nxt.is_alive():
+                    consecutive_failures += 1
+                    if consecutive_failures > 5:
+                        print("⚠️ [NXT] Connection dead, reconnecting...")
+                        if self.nxt.connect():
+                            consecutive_failures = 0
+                        else:
+                            await asyncio.sleep(1)
+                            continue
+                    await asyncio.sleep(0.1)
+                    continue
+                
+                consecutive_failures = 0
+                self.nxt.start_reader(asyncio.get_running_loop())
+                
+                packet = await self.nxt.read_packet(CONFIG['nxt']['poll_timeout'])
+                if not packet:
+                    continue
+                
+                log_message('nxt', 'FROM_HUB', packet)
+                stats['nxt']['from_hub'] += 1
+                
+                request = self._match_reply(packet)
+                if request:
+                    if not request.expired:
+                        request.client.offer(packet)
+                    continue
+                
+                for client in list(self.clients):
+                    client.offer(packet)
+                    
+            except Exception as e:
+                stats['nxt']['errors'] += 1
+                if DEBUG:
+                    print(f"⚠️ [NXT] Hub reader error: {e}")
+                await asyncio.sleep(0.1)
+    
+    async def send(self, client: NXTClient, telegram: bytes) -> bool:
+        """Queue a telegram for the NXT, tracking it if it expects a reply"""
+        request = None
+        if len(telegram) >= 4 and telegram[2] in NXT_REPLY_EXPECTED:
+            # Blocks this client once max_inflight replies are outstanding
+            await client.inflight.acquire()
+            request = NXTPendingRequest(client, telegram[3])
+            
+            # Register when queueing: reply-expecting telegrams are never
+            # reordered, so FIFO order stays identical to wire order
+            self.pending.append(request)
+            histogram_add(stats['nxt']['inflight'], len(self.pending), DEPTH_BUCKETS)
+        
+        if request:
+            self.outbound.put(telegram, lambda: self._finish(request), lambda: self._sent(request))
+        else:
+            self.outbound.put(telegram)
+        return True
+    
+    def _sent(self, request: NXTPendingRequest):
+        """The telegram is on the wire: its reply timeout starts now"""
+        if request not in self.pending:
+            return
+        request.sent_at = time.monotonic()
+        request.timer = asyncio.get_running_loop().call_later(
+            CONFIG['nxt']['reply_timeout'], self._expire, request
+        )
+    
+    def _match_reply(self, packet: bytes) -> Optional[NXTPendingRequest]:
+        """Find and complete the oldest request answered by this reply"""
+        if len(packet) < 4 or packet[2] != NXT_REPLY:
+            return None
+        
+        opcode = packet[3]
+        owner = next((request for request in self.pending if request.opcode == opcode), None)
+        if owner is None:
+            return None
+        
+        # The brick answers in order, so tombstones queued ahead of the
+        # owner will never get their reply
+        for request in list(self.pending):
+            if request is owner:
+                break
+            if request.expired:
+                self._finish(request)
+        
+        self._finish(owner)
+        if owner.expired:
+            stats['nxt']['late_replies'] += 1
+        elif owner.sent_at is not None:
+            rtt_ms = (time.monotonic() - owner.sent_at) * 1000
+            histogram_add(stats['nxt']['rtt_ms'], rtt_ms, RTT_BUCKETS_MS)
+        return owner
+    
+    def _expire(self, request: NXTPendingRequest):
+        if request not in self.pending:
+            return
+        if request.expired:
+            # Grace over: the reply is lost, stop holding its place
+            self.pending.remove(request)
+            return
+        
+        stats['nxt']['timeouts'] += 1
+        if DEBUG:
+            op_name = NXT_OPCODE_NAMES.get(request.opcode, f"0x{request.opcode:02X}")
+            print(f"⚠️ [NXT] No reply to {op_name} within {CONFIG['nxt']['reply_timeout']}s")
+        # Free the client's slot, but keep the request in the FIFO so its
+        # late reply is swallowed rather than handed to a newer request
+        request.expired = True
+        request.client.inflight.release()
+        request.timer = asyncio.get_running_loop().call_later(
+            CONFIG['nxt']['late_reply_grace'], self._expire, request
+        )
+    
+    def _finish(self, request: NXTPendingRequest):
+        if request not in self.pending:
+            return
+        self.pending.remove(request)
+        if request.timer:
+            request.timer.cancel()
+        if not request.expired:
+            request.client.inflight.release()
+    
+    async def stop(self):
+        if self.reader_task:
+            self.reader_task.cancel()
+
 # ============================================================================
 # SPIKE PRIME CONNECTION HANDLER
 # ============================================================================
 
+class SPIKELineFramer:
+    """Incremental line splitter for SPIKE REPL/telemetry output
+
+    Bytes accumulate in a bytearray; each feed decodes everything up to the
+    last newline in one go and returns all complete lines, so the cost is
+    linear in the data however fast the hub prints.
+    """
+    
+    def __init__(self):
+        self.buffer = bytearray()
+    
+    def feed(self, data: bytes) -> List[str]:
+        """Append data and return all complete, non-empty lines"""
+        self.buffer += data
+        end = self.buffer.rfind(b'\n')
+        if end < 0:
+            return []
+        
+        text = memoryview(self.buffer)[:end].tobytes().decode('utf-8', errors='ignore')
+        del self.buffer[:end + 1]
+        return [line.strip() for line in text.split('\n') if line.strip()]
+    
+    def reset(self):
+        """Discard any partial line"""
+        self.buffer.clear()
+
 class SPIKEConnection:
     """Manages SPIKE Prime serial connection"""
     
@@ -534,7 +1025,12 @@ class SPIKEConnection:
         self.port_name = port_name
         self.ser = None
         self.connected = False
-        self.read_buffer = ""
+        self.framer = SPIKELineFramer()
+        self.lines: Optional[asyncio.Queue] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.reader_thread: Optional[threading.Thread] = None
+        self.reader_paused = False
+        self.upload_lock = threading.Lock()
         
     def connect(self) -> bool:
         """Open serial connection"""
@@ -551,6 +1047,10 @@ class SPIKEConnection:
             time.sleep(0.2)
             
             print(f"✅ [SPIKE] Connected to {self.port_name}")
+            
+            # Restart the reader after a reconnect
+            if self.loop is not None:
+                self.start_reader(self.loop)
             return True
         except Exception as e:
             print(f"❌ [SPIKE] Connection failed: {e}")
@@ -560,29 +1060,186 @@ class SPIKEConnection:
         """Check if connection is alive"""
         return self.connected and self.ser and self.ser.is_open
     
-    def read_line_nonblocking(self) -> Optional[str]:
-        """Read a line without blocking"""
+    def start_reader(self, loop: asyncio.AbstractEventLoop):
+        """Start the background reader thread (idempotent)"""
+        self.loop = loop
+        if self.lines is None:
+            self.lines = asyncio.Queue()
+        
+        if self.reader_thread and self.reader_thread.is_alive():
+            return
+        
+        self.framer.reset()
+        self.reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
+        self.reader_thread.start()
+    
+    def _reader_loop(self):
+        """Blocking serial reads; each chunk's complete lines go over as one batch"""
+        ser = self.ser
+        while self.connected and not self.reader_paused and ser is self.ser and ser.is_open:
+            try:
+                chunk = ser.read(ser.in_waiting or 1)
+            except Exception as e:
+                if self.connected and DEBUG:
+                    print(f"⚠️ [SPIKE] Read error: {e}")
+                self.connected = False
+                break
+            
+            if not chunk:
+                continue
+            
+            batch = self.framer.feed(chunk)
+            if batch:
+                self.loop.call_soon_threadsafe(self.lines.put_nowait, batch)
+    
+    async def read_lines(self, timeout: Optional[float] = None) -> List[str]:
+        """Wait for the next batch of lines (empty on timeout)"""
+        try:
+            batch = await asyncio.wait_for(self.lines.get(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        
+        # Merge anything else already waiting into the same batch
+        while not self.lines.empty():
+            batch.extend(self.lines.get_nowait())
+        return batch
+    
+    def _read_until(self, ending: bytes, timeout: float) -> bytes:
+        """Read raw bytes until ending or timeout (reader thread must be paused)"""
+        data = bytearray()
+        deadline = time.monotonic() + timeout
+        while not data.endswith(ending) and time.monotonic() < deadline:
+            # Byte by byte: whatever follows the marker belongs to the next read
+            data += self.ser.read(1)
+        return bytes(data)
+    
+    def _read_exact(self, size: int, timeout: float) -> bytes:
+        """Read size bytes or until timeout (reader thread must be paused)
+
+        An empty read only means the port's own 0.1 s timeout passed; a reply
+        over Bluetooth SPP can take far longer, so keep waiting.
+        """
+        data = bytearray()
+        deadline = time.monotonic() + timeout
+        while len(data) < size and time.monotonic() < deadline:
+            data += self.ser.read(size - len(data))
+        return bytes(data)
+    
+    def _raw_paste_write(self, code: bytes) -> bool:
+        """Stream code using the raw-paste window flow control"""
+        reply_timeout = CONFIG['spike']['reply_timeout']
+        window = self._read_exact(2, reply_timeout)
+        if len(window) < 2:
+            return False
+        window_size = int.from_bytes(window, 'little')
+        window_remain = window_size
+        sent = 0
+        
+        while sent < len(code):
+            # Wait for the hub to grant more window (0x01) or abort (0x04)
+            while window_remain == 0 or self.ser.in_waiting:
+                flag = self._read_exact(1, reply_timeout)
+                if flag == b'\x01':
+                    window_remain += window_size
+                elif flag == b'\x04':
+                    self.ser.write(b'\x04')
+                    return True
+                else:
+                    return False
+            
+            chunk = code[sent:sent + window_remain]
+            self.ser.write(chunk)
+            window_remain -= len(chunk)
+            sent += len(chunk)
+        
+        self.ser.write(b'\x04')
+        return self._read_until(b'\x04', reply_timeout).endswith(b'\x04')
+    
+    def upload(self, source: str, run_timeout: float) -> Dict[str, Any]:
+        """Run a program through the MicroPython raw REPL
+
+        Uses raw-paste mode (flow-controlled to the hub's buffer window) when
+        the firmware supports it, otherwise plain raw REPL in fixed chunks.
+        The serial reader is paused for the duration.
+        """
         if not self.is_alive():
-            return None
+            return {'ok': False, 'error': 'Not connected'}
+        if not self.upload_lock.acquire(blocking=False):
+            return {'ok': False, 'error': 'Upload already in progress'}
         
+        self.reader_paused = True
         try:
-            if self.ser.in_waiting > 0:
-                chunk = self.ser.read(self.ser.in_waiting).decode('utf-8', errors='ignore')
-                self.read_buffer += chunk
+            if self.reader_thread:
+                self.reader_thread.join()
             
-            if '\n' in self.read_buffer:
-                line, self.read_buffer = self.read_buffer.split('\n', 1)
-                return line.strip()
+            code = source.encode('utf-8')
+            reply_timeout = CONFIG['spike']['reply_timeout']
+            started = time.monotonic()
+            
+            # Interrupt whatever runs and enter the raw REPL
+            self.ser.write(b'\r\x03\x03')
+            time.sleep(0.1)
+            self.ser.reset_input_buffer()
+            self.ser.write(b'\r\x01')
+            if not self._read_until(b'raw REPL; CTRL-B to exit\r\n>', reply_timeout).endswith(b'>'):
+                return {'ok': False, 'error': 'Could not enter raw REPL'}
+            
+            self.ser.write(b'\x05A\x01')
+            reply = self._read_exact(2, reply_timeout)
+            if reply == b'R\x01':
+                mode = 'raw-paste'
+                ok = self._raw_paste_write(code)
+            else:
+                if reply != b'R\x00':
+                    # Old firmware echoes the request and reprints the prompt
+                    self._read_until(b'w REPL; CTRL-B to exit\r\n>', reply_timeout)
+                mode = 'raw'
+                chunk_size = CONFIG['spike']['raw_chunk_size']
+                for i in range(0, len(code), chunk_size):
+                    self.ser.write(code[i:i + chunk_size])
+                    time.sleep(0.01)
+                self.ser.write(b'\x04')
+                ok = self._read_exact(2, reply_timeout) == b'OK'
+            
+            transfer_time = time.monotonic() - started
+            if not ok:
+                self.ser.write(b'\r\x02')
+                return {'ok': False, 'mode': mode, 'error': 'Hub did not acknowledge the program'}
+            
+            # Raw REPL output: stdout \x04 stderr \x04 >
+            output = self._read_until(b'\x04', run_timeout)
+            finished = output.endswith(b'\x04')
+            error = b''
+            if finished:
+                error = self._read_until(b'\x04', reply_timeout)
+                self._read_until(b'>', reply_timeout)
+            
+            # Back to the friendly REPL (buffered until a running program ends)
+            self.ser.write(b'\r\x02')
+            
+            return {
+                'ok': not error.strip(b'\x04'),
+                'mode': mode,
+                'bytes': len(code),
+                'transfer_time': round(transfer_time, 3),
+                'running': not finished,
+                'output': output.rstrip(b'\x04').decode('utf-8', errors='ignore'),
+                'error': error.rstrip(b'\x04').decode('utf-8', errors='ignore')
+            }
             
-            return None
         except Exception as e:
-            if DEBUG:
-                print(f"⚠️ [SPIKE] Read error: {e}")
-            return None
+            stats['spike']['errors'] += 1
+            return {'ok': False, 'error': str(e)}
+        finally:
+            self.reader_paused = False
+            self.upload_lock.release()
+            if self.loop is not None:
+                self.reader_thread = None
+                self.start_reader(self.loop)
     
     def write(self, data: str) -> bool:
         """Write text to SPIKE"""
-        if not self.is_alive():
+        if not self.is_alive() or self.upload_lock.locked():
             return False
         try:
             if isinstance(data, str):
@@ -615,6 +1272,9 @@ class BoostConnection:
         self.client = None
         self.connected = False
         self.notification_callback = None
+        self.write_queue: Optional[asyncio.Queue] = None
+        self.writer_task: Optional[asyncio.Task] = None
+        self.with_response: Dict[str, bool] = {}
         
     async def scan(self, timeout: float = 5.0) -> Optional[str]:
         """Scan for Boost hub"""
@@ -675,81 +1335,200 @@ class BoostConnection:
             print(f"⚠️ [BOOST] Notification error: {e}")
             return False
     
+    def _use_response(self, characteristic_uuid: str) -> bool:
+        """Pick the GATT write type for a characteristic (cached)"""
+        if characteristic_uuid not in self.with_response:
+            mode = CONFIG['boost']['write_mode']
+            if mode == 'response':
+                use_response = True
+            elif mode == 'no_response':
+                use_response = False
+            else:
+                # LWP hub characteristics allow write-without-response
+                char = self.client.services.get_characteristic(characteristic_uuid)
+                use_response = not (char and 'write-without-response' in char.properties)
+            self.with_response[characteristic_uuid] = use_response
+            if DEBUG:
+                print(f"✍️  [BOOST] Writes {'with' if use_response else 'without'} response")
+        return self.with_response[characteristic_uuid]
+    
     async def write(self, characteristic_uuid: str, data: bytes) -> bool:
-        """Write data to Boost"""
+        """Queue data for the Boost writer task (commands are pipelined)
+
+        The queue is bounded: once the hub falls behind (writes with
+        response), write() waits, which in turn stops the relay reading
+        from the client instead of letting motor commands pile up.
+        """
         if not self.is_alive():
             return False
         
-        try:
-            await self.client.write_gatt_char(characteristic_uuid, data)
-            return True
-        except Exception as e:
-            if DEBUG:
-                print(f"⚠️ [BOOST] Write error: {e}")
-            return False
+        if self.write_queue is None:
+            self.write_queue = asyncio.Queue(maxsize=CONFIG['boost']['write_queue_size'])
+        if self.writer_task is None or self.writer_task.done():
+            self.writer_task = asyncio.create_task(self._writer())
+        
+        await self.write_queue.put((characteristic_uuid, data))
+        return True
+    
+    def _pack(self, batch: List[tuple]) -> List[tuple]:
+        """Concatenate consecutive messages into sub-MTU writes if enabled"""
+        if not CONFIG['boost']['batch_writes']:
+            return [(uuid, data, 1) for uuid, data in batch]
+        
+        limit = getattr(self.client, 'mtu_size', 23) - 3
+        packed = []
+        for uuid, data in batch:
+            if packed and packed[-1][0] == uuid and len(packed[-1][1]) + len(data) <= limit:
+                last_uuid, last_data, count = packed[-1]
+                packed[-1] = (uuid, last_data + data, count + 1)
+            else:
+                packed.append((uuid, data, 1))
+        return packed
+    
+    async def _writer(self):
+        """Drain the write queue; everything queued meanwhile goes out back to back"""
+        while True:
+            batch = [await self.write_queue.get()]
+            while not self.write_queue.empty():
+                batch.append(self.write_queue.get_nowait())
+            
+            for uuid, payload, count in self._pack(batch):
+                started = time.monotonic()
+                try:
+                    await self.client.write_gatt_char(
+                        uuid, payload, response=self._use_response(uuid)
+                    )
+                    stats['boost']['commands'] += count
+                    stats['boost']['gatt_writes'] += 1
+                except Exception as e:
+                    stats['boost']['errors'] += 1
+                    if DEBUG:
+                        print(f"⚠️ [BOOST] Write error: {e}")
+                stats['boost']['write_time'] += time.monotonic() - started
     
     async def close(self):
         """Close connection"""
         self.connected = False
+        if self.writer_task:
+            self.writer_task.cancel()
         if self.client:
             try:
                 await self.client.disconnect()
             except:
                 pass
 
+class BoostNotificationPump:
+    """Ordered, bounded delivery of BLE notifications to one WebSocket client
+
+    The BLE callback only enqueues; a single sender task drains the queue,
+    so frames keep notification order and a slow client costs at most
+    client_queue_size notifications (oldest dropped first). Clients that
+    connect with ?batch=1 get bursts packed into one frame; LWP messages
+    carry their own length, so the client can split them again.
+    """
+    
+    def __init__(self, websocket, binary: bool, batch: bool):
+        self.websocket = websocket
+        self.binary = binary
+        self.max_batch = CONFIG['boost']['max_batch'] if batch else 1
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=CONFIG['boost']['client_queue_size'])
+        self.dropped = 0
+    
+    def push(self, data: bytes):
+        """Called from the BLE notification callback; never blocks"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            stats['boost']['dropped'] += 1
+        self.queue.put_nowait(data)
+        if self.queue.qsize() > stats['boost']['queue_peak']:
+            stats['boost']['queue_peak'] = self.queue.qsize()
+    
+    async def run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            
+            try:
+                await self.websocket.send(encode_frame(b''.join(batch), self.binary))
+            except websockets.exceptions.ConnectionClosed:
+                break
+            except Exception as e:
+                stats['boost']['errors'] += 1
+                if DEBUG:
+                    print(f"⚠️ [BOOST] Sender error: {e}")
+
 # ============================================================================
 # WEBSOCKET RELAY HANDLERS
 # ============================================================================
 
-async def nxt_relay_handler(websocket, nxt: NXTConnection):
+def handle_nxt_control(hub: NXTHub, client: NXTClient, message: str) -> dict:
+    """Handle a JSON control message from an NXT client
+
+    {"cmd": "watch", "type": "input", "port": 0, "interval": 20}
+    {"cmd": "unwatch", "type": "output", "port": 1}
+    Watched values arrive as ordinary GETINPUTVALUES/GETOUTPUTSTATE reply
+    telegrams, and only when they change.
+    """
+    try:
+        request = json.loads(message)
+        cmd = request.get('cmd')
+        kind = request.get('type', 'input')
+        port = int(request.get('port', 0))
+        
+        max_port = 3 if kind == 'input' else 2
+        if kind not in NXT_WATCH_OPCODES or not 0 <= port <= max_port:
+            return {'cmd': cmd, 'ok': False, 'error': f'Invalid value {kind}:{port}'}
+        
+        if cmd == 'watch':
+            interval = float(request.get('interval', 50)) / 1000
+            hub.watch(client, kind, port, interval)
+        elif cmd == 'unwatch':
+            hub.unwatch(client, kind, port)
+        else:
+            return {'cmd': cmd, 'ok': False, 'error': f'Unknown command: {cmd}'}
+        
+        if DEBUG:
+            print(f"👀 [NXT] {cmd} {kind}:{port} ({len(hub.watches)} active)")
+        return {'cmd': cmd, 'ok': True, 'type': kind, 'port': port}
+        
+    except (ValueError, TypeError) as e:
+        return {'ok': False, 'error': str(e)}
+
+async def nxt_relay_handler(websocket, hub: NXTHub):
     """Handle NXT WebSocket relay with full protocol support"""
     client_ip = websocket.remote_address[0]
     print(f"📱 [NXT] Client connected from {client_ip}")
+    client = hub.subscribe(websocket)
+    binary = wants_binary(websocket)
+    if binary:
+        print(f"   [NXT] Binary frames enabled for {client_ip}")
     
     async def nxt_to_client():
-        """Continuously poll for NXT packets"""
-        consecutive_failures = 0
+        """Drain this client's queue of telegrams broadcast by the hub"""
         while True:
             try:
-                if not nxt.is_alive():
-                    consecutive_failures += 1
-                    if consecutive_failures > 5:
-                        print("⚠️ [NXT] Connection dead, reconnecting...")
-                        if nxt.connect():
-                            consecutive_failures = 0
-                        else:
-                            await asyncio.sleep(1)
-                            continue
-                    await asyncio.sleep(0.1)
-                    continue
-                
-                consecutive_failures = 0
-                
-                packet = await asyncio.get_event_loop().run_in_executor(
-                    None, nxt.read_packet_polling
-                )
-                
-                if packet:
-                    log_message('nxt', 'FROM_HUB', packet)
-                    stats['nxt']['from_hub'] += 1
-                    
-                    b64_data = base64.b64encode(packet).decode('utf-8')
-                    await websocket.send(b64_data)
-                else:
-                    await asyncio.sleep(0.05)
+                packet = await client.queue.get()
+                await websocket.send(encode_frame(packet, binary))
                     
             except Exception as e:
                 stats['nxt']['errors'] += 1
                 if DEBUG:
-                    print(f"⚠️ [NXT] Reader error: {e}")
+                    print(f"⚠️ [NXT] Sender error: {e}")
                 break
     
-    reader_task = asyncio.create_task(nxt_to_client())
+    sender_task = asyncio.create_task(nxt_to_client())
     
     try:
         async for message in websocket:
             try:
-                raw_telegram = base64.b64decode(message)
+                # JSON control messages can never be valid base64
+                if isinstance(message, str) and message.startswith('{'):
+                    await websocket.send(json.dumps(handle_nxt_control(hub, client, message)))
+                    continue
+                
+                raw_telegram = decode_frame(message)
                 
                 if len(raw_telegram) == 0:
                     continue
@@ -757,10 +1536,8 @@ async def nxt_relay_handler(websocket, nxt: NXTConnection):
                 log_message('nxt', 'TO_HUB', raw_telegram)
                 stats['nxt']['to_hub'] += 1
                 
-                # Write with retry logic
-                await asyncio.get_event_loop().run_in_executor(
-                    None, nxt.write, raw_telegram
-                )
+                # Queued for the writer; replies are routed back to us
+                await hub.send(client, raw_telegram)
                     
             except Exception as e:
                 stats['nxt']['errors'] += 1
@@ -770,9 +1547,39 @@ async def nxt_relay_handler(websocket, nxt: NXTConnection):
     except websockets.exceptions.ConnectionClosed:
         print(f"📴 [NXT] Client {client_ip} disconnected")
         if DEBUG:
+            if client.dropped:
+                print(f"   Dropped {client.dropped} telegrams (slow client)")
             print_stats()
     finally:
-        reader_task.cancel()
+        hub.unsubscribe(client)
+        sender_task.cancel()
+
+async def handle_spike_control(spike: SPIKEConnection, message: str) -> Optional[dict]:
+    """Handle a JSON control message from a SPIKE client, None if it is REPL input
+
+    {"cmd": "upload", "source": "...", "path": "main.py", "timeout": 5}
+    Without "path" the program runs right away; with it, it is saved on the hub.
+    """
+    try:
+        request = json.loads(message)
+    except ValueError:
+        return None
+    if not isinstance(request, dict) or request.get('cmd') != 'upload':
+        return None
+    
+    source = request.get('source', '')
+    if request.get('path'):
+        source = f"with open({request['path']!r}, 'w') as f:\n    f.write({source!r})\n"
+    
+    run_timeout = float(request.get('timeout', CONFIG['spike']['run_timeout']))
+    print(f"📤 [SPIKE] Uploading {len(source)} bytes...")
+    result = await asyncio.get_running_loop().run_in_executor(
+        None, spike.upload, source, run_timeout
+    )
+    if DEBUG:
+        print(f"📤 [SPIKE] Upload {'OK' if result.get('ok') else 'failed'} "
+              f"({result.get('mode', '-')}, {result.get('transfer_time', 0)}s)")
+    return {'cmd': 'upload', **result}
 
 async def spike_relay_handler(websocket, spike: SPIKEConnection):
     """Handle SPIKE Prime WebSocket relay"""
@@ -797,17 +1604,12 @@ async def spike_relay_handler(websocket, spike: SPIKEConnection):
                     continue
                 
                 consecutive_failures = 0
+                spike.start_reader(asyncio.get_running_loop())
                 
-                line = await asyncio.get_event_loop().run_in_executor(
-                    None, spike.read_line_nonblocking
-                )
-                
-                if line:
+                for line in await spike.read_lines(1.0):
                     log_message('spike', 'FROM_HUB', line)
                     stats['spike']['from_hub'] += 1
                     await websocket.send(line)
-                else:
-                    await asyncio.sleep(0.02)
                     
             except Exception as e:
                 stats['spike']['errors'] += 1
@@ -820,6 +1622,12 @@ async def spike_relay_handler(websocket, spike: SPIKEConnection):
     try:
         async for message in websocket:
             try:
+                if message.startswith('{'):
+                    result = await handle_spike_control(spike, message)
+                    if result is not None:
+                        await websocket.send(json.dumps(result))
+                        continue
+                
                 log_message('spike', 'TO_HUB', message)
                 stats['spike']['to_hub'] += 1
                 
@@ -840,14 +1648,16 @@ async def boost_relay_handler(websocket, boost: BoostConnection):
     """Handle LEGO Boost WebSocket relay"""
     client_ip = websocket.remote_address[0]
     print(f"📱 [BOOST] Client connected from {client_ip}")
+    pump = BoostNotificationPump(websocket, wants_binary(websocket), query_flag(websocket, 'batch'))
+    sender_task = asyncio.create_task(pump.run())
     
     def notification_handler(sender, data: bytearray):
         """Handle BLE notifications"""
+        if sender_task.done():
+            return
         log_message('boost', 'FROM_HUB', bytes(data))
         stats['boost']['from_hub'] += 1
-        
-        b64_data = base64.b64encode(bytes(data)).decode('utf-8')
-        asyncio.create_task(websocket.send(b64_data))
+        pump.push(bytes(data))
     
     await boost.start_notifications(
         CONFIG['boost']['ble_characteristic'],
@@ -857,7 +1667,7 @@ async def boost_relay_handler(websocket, boost: BoostConnection):
     try:
         async for message in websocket:
             try:
-                raw_data = base64.b64decode(message)
+                raw_data = decode_frame(message)
                 
                 if len(raw_data) == 0:
                     continue
@@ -874,6 +1684,10 @@ async def boost_relay_handler(websocket, boost: BoostConnection):
                 
     except websockets.exceptions.ConnectionClosed:
         print(f"📴 [BOOST] Client {client_ip} disconnected")
+        if DEBUG and pump.dropped:
+            print(f"   Dropped {pump.dropped} notifications (slow client)")
+    finally:
+        sender_task.cancel()
 
 # ============================================================================
 # SERVER INITIALIZATION
@@ -881,10 +1695,13 @@ async def boost_relay_handler(websocket, boost: BoostConnection):
 
 async def start_nxt_server(nxt: NXTConnection):
     """Start NXT WebSocket server"""
+    hub = NXTHub(nxt)
+    hub.start()
     async with websockets.serve(
-        lambda ws: nxt_relay_handler(ws, nxt),
+        lambda ws: nxt_relay_handler(ws, hub),
         "0.0.0.0",
-        CONFIG['nxt']['port']
+        CONFIG['nxt']['port'],
+        select_subprotocol=select_binary_subprotocol
     ):
         await asyncio.Future()
 
@@ -902,7 +1719,8 @@ async def start_boost_server(boost: BoostConnection):
     async with websockets.serve(
         lambda ws: boost_relay_handler(ws, boost),
         "0.0.0.0",
-        CONFIG['boost']['port']
+        CONFIG['boost']['port'],
+        select_subprotocol=select_binary_subprotocol
     ):
         await asyncio.Future()
 
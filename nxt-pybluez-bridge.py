@@ -4,6 +4,7 @@ import base64
 import sys
 import socket as sock_module
 from datetime import datetime
+from urllib.parse import urlparse, parse_qs
 
 try:
     import bluetooth
@@ -18,6 +19,10 @@ NXT_NAME = "NXT"  # Your NXT's Bluetooth name
 NXT_ADDRESS = None  # Auto-detect
 DEBUG = True
 
+# Clients that negotiate this sub-protocol (or connect with ?binary=1)
+# exchange raw telegrams in binary frames instead of base64 text frames
+BINARY_SUBPROTOCOL = 'lego-binary'
+
 # Packet statistics
 stats = {
     'to_nxt': 0,
@@ -65,6 +70,18 @@ def log_packet(direction, data, description=""):
     
     print(f"{color}{log_line}\033[0m")
 
+def select_binary_subprotocol(connection, offered):
+    """Pick the binary sub-protocol if offered; clients offering none still connect"""
+    return BINARY_SUBPROTOCOL if BINARY_SUBPROTOCOL in offered else None
+
+def wants_binary(websocket):
+    """Check whether the client negotiated binary frames"""
+    if getattr(websocket, 'subprotocol', None) == BINARY_SUBPROTOCOL:
+        return True
+    request = getattr(websocket, 'request', None)
+    path = request.path if request is not None else getattr(websocket, 'path', '')
+    return parse_qs(urlparse(path or '').query).get('binary', ['0'])[0] in ('1', 'true')
+
 def print_stats():
     if not DEBUG or stats['start_time'] is None:
         return
@@ -217,6 +234,10 @@ async def relay_handler(websocket):
     if stats['start_time'] is None:
         stats['start_time'] = datetime.now()
     
+    binary = wants_binary(websocket)
+    if binary:
+        print(f"   Binary frames enabled for {client_ip}")
+    
     # Read from NXT and forward to WebSocket
     async def nxt_to_client():
         """Forward NXT packets to client"""
@@ -232,8 +253,10 @@ async def relay_handler(websocket):
                     stats['from_nxt'] += 1
                     
                     # Send to client
-                    b64_data = base64.b64encode(packet).decode('utf-8')
-                    await websocket.send(b64_data)
+                    if binary:
+                        await websocket.send(packet)
+                    else:
+                        await websocket.send(base64.b64encode(packet).decode('ascii'))
                 else:
                     # No data, brief sleep
                     await asyncio.sleep(0.01)
@@ -249,7 +272,10 @@ async def relay_handler(websocket):
     try:
         async for message in websocket:
             try:
-                raw_telegram = base64.b64decode(message)
+                if isinstance(message, bytes):
+                    raw_telegram = message
+                else:
+                    raw_telegram = base64.b64decode(message)
                 
                 if len(raw_telegram) == 0:
                     continue
@@ -298,7 +324,8 @@ async def relay_handler(websocket):
 
 
 async def main():
-    async with websockets.serve(relay_handler, "0.0.0.0", LISTEN_PORT):
+    async with websockets.serve(relay_handler, "0.0.0.0", LISTEN_PORT,
+                                select_subprotocol=select_binary_subprotocol):
         local_ip = get_local_ip()
         print(f"\n🎉 Bluetooth Bridge running!")
         print(f"━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
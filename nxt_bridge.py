@@ -15,6 +15,7 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 import os
 import glob
+from collections import deque
 
 # BLE support for Boost
 try:
@@ -46,7 +47,7 @@ CONFIG = {
 
 DEBUG = True
 stats = {
-    'nxt': {'to_hub': 0, 'from_hub': 0, 'errors': 0},
+    'nxt': {'to_hub': 0, 'from_hub': 0, 'errors': 0, 'coalesced': 0},
     'spike': {'to_hub': 0, 'from_hub': 0, 'errors': 0},
     'boost': {'to_hub': 0, 'from_hub': 0, 'errors': 0},
     'start_time': None
@@ -99,6 +100,8 @@ def print_stats():
         hub_stats = stats[hub_type]
         if hub_stats['to_hub'] > 0 or hub_stats['from_hub'] > 0:
             print(f"   {hub_type.upper()}: ↗ {hub_stats['to_hub']} ↙ {hub_stats['from_hub']} ❌ {hub_stats['errors']}")
+            if hub_stats.get('coalesced'):
+                print(f"   {hub_type.upper()}: 🔀 {hub_stats['coalesced']} motor commands coalesced")
 
 def auto_detect_serial_port(hub_type: str) -> Optional[str]:
     """Auto-detect serial port for hub type"""
@@ -204,6 +207,55 @@ class NXTConnection:
             except:
                 pass
 
+# ============================================================================
+# NXT OUTBOUND SCHEDULER
+# ============================================================================
+
+def nxt_coalesce_key(telegram: bytes) -> Optional[int]:
+    """Motor port of a no-reply SETOUTPUTSTATE, the only telegrams we coalesce"""
+    if len(telegram) >= 5 and telegram[2] == 0x80 and telegram[3] == 0x04:
+        return telegram[4]
+    return None
+
+class NXTOutbound:
+    """Outbound telegram queue with last-write-wins for motor commands
+
+    A newer no-reply SETOUTPUTSTATE replaces the queued, unsent one for the
+    same port while the link is busy; everything else keeps its order.
+    """
+    
+    def __init__(self, nxt: NXTConnection):
+        self.nxt = nxt
+        self.queue = deque()
+        self.wakeup = asyncio.Event()
+        self.task = None
+    
+    def put(self, telegram: bytes):
+        key = nxt_coalesce_key(telegram)
+        if key is not None:
+            for index, (queued_key, _) in enumerate(self.queue):
+                if queued_key == key:
+                    del self.queue[index]
+                    stats['nxt']['coalesced'] += 1
+                    break
+        
+        self.queue.append((key, telegram))
+        self.wakeup.set()
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.queue:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            
+            _, telegram = self.queue.popleft()
+            if not await loop.run_in_executor(None, self.nxt.write, telegram):
+                stats['nxt']['errors'] += 1
+
 # ============================================================================
 # SPIKE PRIME CONNECTION HANDLER
 # ============================================================================
@@ -380,7 +432,7 @@ class BoostConnection:
 # WEBSOCKET RELAY HANDLERS
 # ============================================================================
 
-async def nxt_relay_handler(websocket, nxt: NXTConnection):
+async def nxt_relay_handler(websocket, nxt: NXTConnection, outbound: NXTOutbound):
     """Handle NXT WebSocket relay"""
     client_ip = websocket.remote_address[0]
     print(f"📱 [NXT] Client connected from {client_ip}")
@@ -436,8 +488,7 @@ async def nxt_relay_handler(websocket, nxt: NXTConnection):
                 log_message('nxt', 'TO_HUB', raw_telegram)
                 stats['nxt']['to_hub'] += 1
                 
-                if not nxt.write(raw_telegram):
-                    stats['nxt']['errors'] += 1
+                outbound.put(raw_telegram)
                     
             except Exception as e:
                 stats['nxt']['errors'] += 1
@@ -561,8 +612,9 @@ async def boost_relay_handler(websocket, boost: BoostConnection):
 
 async def start_nxt_server(nxt: NXTConnection):
     """Start NXT WebSocket server"""
+    outbound = NXTOutbound(nxt)
     async with websockets.serve(
-        lambda ws: nxt_relay_handler(ws, nxt),
+        lambda ws: nxt_relay_handler(ws, nxt, outbound),
         "0.0.0.0",
         CONFIG['nxt']['port']
     ):
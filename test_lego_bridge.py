@@ -0,0 +1,257 @@
+"""
+Tests for lego_bridge: WebSocket framing (Scratch clients that offer no
+sub-protocol get base64 text frames, binary clients get raw bytes), NXT
+reply routing, and SPIKE uploads over a slow serial link
+"""
+
+import asyncio
+import base64
+import socket
+import time
+
+import websockets
+
+import lego_bridge
+
+
+class FakeBoost:
+    """Stands in for BoostConnection: records writes, lets tests notify"""
+
+    def __init__(self):
+        self.handler = None
+        self.writes = []
+        self.subscribed = asyncio.Event()
+
+    async def start_notifications(self, char_uuid, handler):
+        self.handler = handler
+        self.subscribed.set()
+
+    async def write(self, char_uuid, data):
+        self.writes.append(bytes(data))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def exchange(subprotocols):
+    """Connect to a Boost relay, push one notification and send one packet"""
+    boost = FakeBoost()
+    port = free_port()
+    lego_bridge.CONFIG['boost']['port'] = port
+    server = asyncio.create_task(lego_bridge.start_boost_server(boost))
+    try:
+        for _ in range(50):
+            try:
+                client = await websockets.connect(f"ws://127.0.0.1:{port}",
+                                                  subprotocols=subprotocols)
+                break
+            except OSError:
+                await asyncio.sleep(0.05)
+        async with client:
+            await asyncio.wait_for(boost.subscribed.wait(), 5)
+            boost.handler(0, bytearray(b'\x05\x00\x01'))
+            frame = await asyncio.wait_for(client.recv(), 5)
+            packet = b'\x08\x00\x81\x00\x11\x51\x00\x64'
+            await client.send(packet if client.subprotocol else base64.b64encode(packet).decode())
+            for _ in range(50):
+                if boost.writes:
+                    break
+                await asyncio.sleep(0.02)
+            return client.subprotocol, frame, boost.writes
+    finally:
+        server.cancel()
+
+
+def test_client_without_subprotocol_gets_base64():
+    subprotocol, frame, writes = asyncio.run(exchange(None))
+    assert subprotocol is None
+    assert isinstance(frame, str)
+    assert base64.b64decode(frame) == b'\x05\x00\x01'
+    assert writes == [b'\x08\x00\x81\x00\x11\x51\x00\x64']
+
+
+def test_client_offering_binary_gets_bytes():
+    subprotocol, frame, writes = asyncio.run(exchange([lego_bridge.BINARY_SUBPROTOCOL]))
+    assert subprotocol == lego_bridge.BINARY_SUBPROTOCOL
+    assert frame == b'\x05\x00\x01'
+    assert writes == [b'\x08\x00\x81\x00\x11\x51\x00\x64']
+
+
+class SlowSerial:
+    """Serial port whose hub answers each command after `lag` seconds
+
+    read() behaves like pyserial with timeout=0.1: it returns what has
+    arrived, or b'' once 0.1 s pass with nothing there.
+    """
+
+    timeout = 0.1
+
+    def __init__(self, lag: float):
+        self.lag = lag
+        self.pending = []    # (due, bytes)
+        self.buffer = bytearray()
+        self.written = bytearray()
+        self.is_open = True
+
+    def _answer(self, data: bytes):
+        self.pending.append((time.monotonic() + self.lag, data))
+
+    def _arrive(self):
+        now = time.monotonic()
+        for item in [p for p in self.pending if p[0] <= now]:
+            self.pending.remove(item)
+            self.buffer += item[1]
+
+    @property
+    def in_waiting(self) -> int:
+        self._arrive()
+        return len(self.buffer)
+
+    def read(self, size: int = 1) -> bytes:
+        deadline = time.monotonic() + self.timeout
+        while not self.in_waiting and time.monotonic() < deadline:
+            time.sleep(0.005)
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def write(self, data: bytes):
+        self.written += data
+        if data == b'\r\x01':
+            self._answer(b'raw REPL; CTRL-B to exit\r\n>')
+        elif data == b'\x05A\x01':
+            self._answer(b'R\x01' + (64).to_bytes(2, 'little'))
+        elif data == b'\x04':
+            self._answer(b'\x04hi\r\n\x04\x04>')
+
+    def reset_input_buffer(self):
+        self.buffer.clear()
+
+
+def test_upload_waits_for_slow_spp_replies():
+    spike = lego_bridge.SPIKEConnection('/dev/null')
+    spike.ser = SlowSerial(lag=0.4)
+    spike.connected = True
+
+    result = spike.upload("print('hi')", run_timeout=2.0)
+    assert result['ok'], result
+    assert result['mode'] == 'raw-paste'
+    assert result['output'] == 'hi\r\n'
+    assert b"print('hi')" in spike.ser.written
+
+
+class FakeNXT:
+    """NXTConnection stand-in: each write takes `write_time`, the test injects replies"""
+
+    def __init__(self, write_time: float = 0.0):
+        self.write_time = write_time
+        self.written = []
+        self.replies: asyncio.Queue = asyncio.Queue()
+
+    def is_alive(self) -> bool:
+        return True
+
+    def start_reader(self, loop):
+        pass
+
+    def write(self, telegram: bytes) -> bool:
+        time.sleep(self.write_time)
+        self.written.append(telegram)
+        return True
+
+    async def read_packet(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.replies.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+GET_INPUT = bytes([0x03, 0x00, 0x00, 0x07, 0x00])
+
+
+def input_reply(value: int) -> bytes:
+    return bytes([0x05, 0x00, 0x02, 0x07, 0x00, 0x00, value])
+
+
+def test_late_nxt_reply_is_not_given_to_a_newer_request(monkeypatch):
+    monkeypatch.setitem(lego_bridge.CONFIG['nxt'], 'reply_timeout', 0.1)
+
+    async def scenario():
+        nxt = FakeNXT()
+        hub = lego_bridge.NXTHub(nxt)
+        a, b = hub.subscribe(None), hub.subscribe(None)
+        await hub.send(a, GET_INPUT)
+        await asyncio.sleep(0.2)            # A times out
+        await hub.send(b, GET_INPUT)
+        nxt.replies.put_nowait(input_reply(1))  # late answer to A
+        nxt.replies.put_nowait(input_reply(2))  # answer to B
+        reply = await asyncio.wait_for(b.queue.get(), 1)
+        await asyncio.sleep(0.05)
+        assert reply == input_reply(2)
+        assert b.queue.empty() and a.queue.empty()
+        assert not hub.pending
+        await hub.stop()
+
+    asyncio.run(scenario())
+
+
+def test_nxt_reply_timeout_starts_when_written(monkeypatch):
+    monkeypatch.setitem(lego_bridge.CONFIG['nxt'], 'reply_timeout', 0.3)
+    monkeypatch.setitem(lego_bridge.stats, 'nxt', dict(lego_bridge.stats['nxt'], timeouts=0))
+
+    async def scenario():
+        nxt = FakeNXT(write_time=0.2)
+        hub = lego_bridge.NXTHub(nxt)
+        client = hub.subscribe(None)
+        for _ in range(3):
+            await hub.send(client, GET_INPUT)
+        # The brick answers each request 0.1 s after it is written; the last
+        # one is written 0.6 s after it was queued
+        for value in range(3):
+            while len(nxt.written) <= value:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)
+            nxt.replies.put_nowait(input_reply(value))
+        replies = [await asyncio.wait_for(client.queue.get(), 1) for _ in range(3)]
+        assert replies == [input_reply(value) for value in range(3)]
+        assert lego_bridge.stats['nxt']['timeouts'] == 0
+        await hub.stop()
+
+    asyncio.run(scenario())
+
+
+class SlowBleakClient:
+    """BleakClient stand-in whose GATT writes take `write_time` seconds"""
+
+    is_connected = True
+
+    def __init__(self, write_time: float):
+        self.write_time = write_time
+        self.writes = []
+
+    async def write_gatt_char(self, uuid, data, response=True):
+        await asyncio.sleep(self.write_time)
+        self.writes.append(bytes(data))
+
+
+def test_boost_write_applies_backpressure(monkeypatch):
+    monkeypatch.setitem(lego_bridge.CONFIG['boost'], 'write_mode', 'response')
+    monkeypatch.setitem(lego_bridge.CONFIG['boost'], 'write_queue_size', 4)
+    char = lego_bridge.CONFIG['boost']['ble_characteristic']
+
+    async def scenario():
+        boost = lego_bridge.BoostConnection()
+        boost.client = SlowBleakClient(write_time=0.01)
+        boost.connected = True
+        backlog = 0
+        for i in range(40):
+            await boost.write(char, bytes([0x08, 0x00, 0x81, i]))
+            backlog = max(backlog, i + 1 - len(boost.client.writes))
+        # Queue plus the batch the writer is working through
+        assert backlog <= 2 * 4 + 1
+        await boost.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,453 @@
+"""
+Tests for universal_bridge sessions against a fake BLE transport
+(no bleak, no adapter): sessions are driven through their JSON-RPC loop
+by a fake WebSocket, and bleak is replaced by FakeScanner/FakeClient.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import universal_bridge as ub
+
+HUB = 'AA:BB:CC:DD:EE:FF'
+CHAR = '00001624-1212-efde-1623-785feabcd123'
+
+
+class FakeWebSocket:
+    """Client end of a session: requests go in, frames come out"""
+
+    def __init__(self):
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.frames = []
+        self.arrived = asyncio.Event()
+        self.subprotocol = None
+        self.remote_address = ('127.0.0.1', 0)
+        self.next_id = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.incoming.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+    async def send(self, frame):
+        self.frames.append(json.loads(frame))
+        self.arrived.set()
+
+    def request(self, method: str, params: dict = None) -> int:
+        self.next_id += 1
+        self.incoming.put_nowait(json.dumps({'jsonrpc': '2.0', 'id': self.next_id,
+                                             'method': method, 'params': params or {}}))
+        return self.next_id
+
+    async def wait_for(self, match, timeout: float = 5.0) -> dict:
+        async def scan():
+            while True:
+                for frame in self.frames:
+                    if match(frame):
+                        return frame
+                self.arrived.clear()
+                await self.arrived.wait()
+        return await asyncio.wait_for(scan(), timeout)
+
+    async def call(self, method: str, params: dict = None) -> dict:
+        request_id = self.request(method, params)
+        return await self.wait_for(lambda frame: frame.get('id') == request_id)
+
+
+class FakeScanner:
+    """BleakScanner stand-in; start() takes `delay` seconds"""
+
+    delay = 0.0
+
+    def __init__(self, detection_callback, scanning_mode='active'):
+        self.callback = detection_callback
+        self.scanning_mode = scanning_mode
+        self.running = False
+        FakeScanner.last = self
+
+    async def start(self):
+        await asyncio.sleep(self.delay)
+        self.running = True
+
+    async def stop(self):
+        self.running = False
+
+    def advertise(self, address=HUB, name='LEGO Move Hub', rssi=-50):
+        self.callback(SimpleNamespace(address=address, name=name),
+                      SimpleNamespace(local_name=name, rssi=rssi))
+
+
+class FakeClient:
+    """BleakClient stand-in; connect and start_notify take `delay` seconds"""
+
+    delay = 0.0
+    instances = []
+
+    def __init__(self, device):
+        self.device = device
+        self.is_connected = False
+        self.callbacks = {}
+        self.log = []
+        self.services = SimpleNamespace(get_characteristic=lambda uuid: None)
+        FakeClient.instances.append(self)
+
+    async def connect(self):
+        await asyncio.sleep(self.delay)
+        self.is_connected = True
+
+    async def disconnect(self):
+        self.is_connected = False
+
+    async def start_notify(self, char_uuid, callback):
+        await asyncio.sleep(self.delay)
+        self.callbacks[char_uuid] = callback
+        self.log.append(('startNotifications', char_uuid))
+
+    async def stop_notify(self, char_uuid):
+        self.callbacks.pop(char_uuid, None)
+        self.log.append(('stopNotifications', char_uuid))
+
+    async def read_gatt_char(self, char_uuid):
+        self.log.append(('read', char_uuid))
+        return b'\x00'
+
+    async def write_gatt_char(self, char_uuid, data, response=True):
+        self.log.append(('write', bytes(data)))
+
+
+@pytest.fixture
+def fake_ble(monkeypatch):
+    monkeypatch.setattr(ub, 'BLEAK_AVAILABLE', True)
+    monkeypatch.setattr(ub, 'BleakScanner', FakeScanner)
+    monkeypatch.setattr(ub, 'BleakClient', FakeClient)
+    monkeypatch.setattr(ub.BLESession, 'registry', ub.BLEDeviceRegistry())
+    monkeypatch.setattr(ub.BLESession, 'nr_connected', 0)
+    monkeypatch.setattr(ub, 'link_pool', ub.LinkPool(grace=60))
+    monkeypatch.setattr(FakeClient, 'instances', [])
+    monkeypatch.setattr(FakeClient, 'delay', 0.0)
+    monkeypatch.setattr(FakeScanner, 'delay', 0.0)
+
+
+def open_session():
+    websocket = FakeWebSocket()
+    session = ub.BLESession(websocket, asyncio.get_running_loop())
+    task = asyncio.create_task(session.handle())
+    return websocket, task
+
+
+async def close_session(websocket, task):
+    websocket.incoming.put_nowait(None)
+    await asyncio.wait_for(task, 5)
+
+
+def discovered(frame) -> bool:
+    return frame.get('method') == 'didDiscoverPeripheral'
+
+
+def test_reload_after_ttl_reattaches_parked_link(fake_ble):
+    async def scenario():
+        websocket, task = open_session()
+        await websocket.call('discover', {'filters': [{'namePrefix': 'LEGO'}]})
+        FakeScanner.last.advertise()
+        found = await websocket.wait_for(discovered)
+        assert 'error' not in await websocket.call('connect', {'peripheralId': found['params']['peripheralId']})
+        await websocket.call('startNotifications', {'serviceId': 'hub', 'characteristicId': CHAR})
+        await close_session(websocket, task)
+
+        # The connected hub no longer advertises; outlive the registry ttl
+        entry = ub.BLESession.registry.entries[HUB]
+        entry['last_seen'] -= ub.BLESession.registry.ttl + 1
+
+        websocket, task = open_session()
+        await websocket.call('discover', {'filters': [{'namePrefix': 'LEGO'}]})
+        again = await websocket.wait_for(discovered)
+        assert again['params']['peripheralId'] == found['params']['peripheralId']
+        assert 'error' not in await websocket.call('connect', {'peripheralId': again['params']['peripheralId']})
+
+        # Same BleakClient, and its subscription now feeds the new session
+        assert len(FakeClient.instances) == 1
+        FakeClient.instances[0].callbacks[CHAR](0, b'\x0f\x00\x04')
+        changed = await websocket.wait_for(lambda f: f.get('method') == 'characteristicDidChange')
+        assert changed['params']['characteristicId'] == CHAR
+        await close_session(websocket, task)
+
+    asyncio.run(scenario())
+
+
+def test_expired_link_releases_registry_entry(fake_ble):
+    async def scenario():
+        ub.link_pool.grace = 0.05
+        websocket, task = open_session()
+        await websocket.call('discover', {})
+        FakeScanner.last.advertise()
+        found = await websocket.wait_for(discovered)
+        await websocket.call('connect', {'peripheralId': found['params']['peripheralId']})
+        await close_session(websocket, task)
+
+        await asyncio.sleep(0.2)
+        assert not FakeClient.instances[0].is_connected
+        ub.BLESession.registry.entries[HUB]['last_seen'] -= ub.BLESession.registry.ttl + 1
+        assert ub.BLESession.registry.current() == []
+
+    asyncio.run(scenario())
+
+
+def test_scanner_runs_only_while_discovering(fake_ble):
+    async def scenario():
+        registry = ub.BLESession.registry
+        first, first_task = open_session()
+        second, second_task = open_session()
+        await first.call('discover', {})
+        await second.call('discover', {})
+        scanner = FakeScanner.last
+        FakeScanner.last.advertise()
+        found = await first.wait_for(discovered)
+        assert scanner.running
+
+        await first.call('connect', {'peripheralId': found['params']['peripheralId']})
+        await asyncio.sleep(0)
+        assert scanner.running and registry.scanner is scanner
+
+        await close_session(second, second_task)
+        await asyncio.sleep(0.05)
+        assert not scanner.running and registry.scanner is None
+
+        # Cached entries are still reported, from a freshly started scanner
+        again, again_task = open_session()
+        await again.call('discover', {})
+        assert await again.wait_for(discovered)
+        assert FakeScanner.last is not scanner and FakeScanner.last.running
+        for websocket, task in ((again, again_task), (first, first_task)):
+            await close_session(websocket, task)
+
+    asyncio.run(scenario())
+
+
+async def connected_session():
+    websocket, task = open_session()
+    await websocket.call('discover', {})
+    FakeScanner.last.advertise()
+    found = await websocket.wait_for(discovered)
+    await websocket.call('connect', {'peripheralId': found['params']['peripheralId']})
+    return websocket, task, FakeClient.instances[-1]
+
+
+def test_slow_discover_does_not_block_writes(fake_ble):
+    async def scenario():
+        websocket, task, client = await connected_session()
+
+        # Connecting stopped the scanner; restarting it now takes a while
+        FakeScanner.delay = 1.0
+        discover_id = websocket.request('discover', {})
+        write_ids = [websocket.request('write', {'characteristicId': CHAR, 'message': 'AQI='})
+                     for _ in range(3)]
+        for write_id in write_ids:
+            response = await websocket.wait_for(lambda f: f.get('id') == write_id, timeout=0.5)
+            assert response['result'] == 2
+        assert not any(f.get('id') == discover_id for f in websocket.frames)
+        assert client.log == [('write', b'\x01\x02')] * 3
+
+        await websocket.wait_for(lambda f: f.get('id') == discover_id)
+        await close_session(websocket, task)
+
+    asyncio.run(scenario())
+
+
+def test_requests_keep_arrival_order(fake_ble):
+    async def scenario():
+        websocket, task, client = await connected_session()
+
+        # Pipelined without waiting; the subscription is slow to confirm
+        client.delay = 0.1
+        ids = [websocket.request('startNotifications', {'serviceId': 'hub', 'characteristicId': CHAR}),
+               websocket.request('write', {'characteristicId': CHAR, 'message': 'AQ=='}),
+               websocket.request('read', {'characteristicId': CHAR}),
+               websocket.request('stopNotifications', {'characteristicId': CHAR}),
+               websocket.request('write', {'characteristicId': CHAR, 'message': 'Ag=='})]
+        await websocket.wait_for(lambda f: f.get('id') == ids[-1])
+
+        assert client.log == [('startNotifications', CHAR), ('write', b'\x01'), ('read', CHAR),
+                              ('stopNotifications', CHAR), ('write', b'\x02')]
+        responses = [f['id'] for f in websocket.frames if f.get('id') in ids]
+        assert responses == ids
+        await close_session(websocket, task)
+
+    asyncio.run(scenario())
+
+
+class FakeBluetoothError(OSError):
+    """PyBluez's BluetoothError is an IOError carrying (errno, message)"""
+
+
+class DeadSocket:
+    """RFCOMM socket stand-in whose recv() raises the given errors in turn"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.reader, self.peer = socket.socketpair()
+        self.peer.send(b'x')    # always readable, like a socket in error
+
+    def fileno(self):
+        return self.reader.fileno()
+
+    def recv(self, size):
+        raise self.errors.pop(0) if len(self.errors) > 1 else self.errors[0]
+
+
+@pytest.fixture
+def fake_bt(monkeypatch):
+    monkeypatch.setattr(ub, 'bluetooth', SimpleNamespace(BluetoothError=FakeBluetoothError))
+
+
+def bt_session(sock):
+    session = ub.BTSession(FakeWebSocket(), None)
+    session.sock = sock
+    session.running = True
+    session.device_name = 'NXT'
+    return session
+
+
+def test_bt_would_block():
+    assert ub.bt_would_block(FakeBluetoothError(11, 'Resource temporarily unavailable'))
+    assert ub.bt_would_block(FakeBluetoothError("(11, 'Resource temporarily unavailable')"))
+    assert not ub.bt_would_block(FakeBluetoothError(104, 'Connection reset by peer'))
+    assert not ub.bt_would_block(FakeBluetoothError('timed out'))
+
+
+def test_on_readable_eagain_is_not_link_loss(fake_bt):
+    session = bt_session(DeadSocket(FakeBluetoothError(11, 'Resource temporarily unavailable')))
+    session._on_readable()
+    assert session.running and not session.link_lost
+
+
+def test_on_readable_reset_is_link_loss(fake_bt):
+    session = bt_session(DeadSocket(FakeBluetoothError(104, 'Connection reset by peer')))
+    session._on_readable()
+    assert not session.running and session.link_lost
+
+
+def test_receive_thread_stops_on_dead_socket(fake_bt):
+    session = bt_session(DeadSocket(FakeBluetoothError(11, 'Resource temporarily unavailable'),
+                                    FakeBluetoothError(104, 'Connection reset by peer')))
+    thread = threading.Thread(target=session._receive_loop, daemon=True)
+    thread.start()
+    thread.join(2)
+    assert not thread.is_alive()
+    assert session.link_lost and not session.running
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(bytes(data))
+
+
+def test_writer_stops_keepalive_after_link_lost(monkeypatch):
+    monkeypatch.setattr(ub.BTSession, 'keepalive_idle', 0.05)
+
+    async def scenario():
+        session = bt_session(RecordingSocket())
+        session.loop = asyncio.get_running_loop()
+        session.keepalive = True
+        session.last_activity = 0
+        writer = asyncio.create_task(session._writer())
+
+        await asyncio.sleep(0.2)
+        assert session.sock.sent, "keepalive while the link is up"
+
+        session.link_lost = True
+        session.running = False
+        await asyncio.sleep(0.1)
+        sent = len(session.sock.sent)
+        await asyncio.sleep(0.2)
+        assert len(session.sock.sent) == sent
+
+        result = await asyncio.wait_for(session._send({'message': 'AgCADQ=='}), 1)
+        assert 'error' in result
+        writer.cancel()
+
+    asyncio.run(scenario())
+
+
+class FakeDiscoverer:
+    """PyBluez DeviceDiscoverer stand-in: one inquiry result per event"""
+
+    responses = []
+
+    def __init__(self):
+        self.reader, self.peer = socket.socketpair()
+        self.is_inquiring = False
+        self.lookup_names = None
+        self.events = []
+
+    def fileno(self):
+        return self.reader.fileno()
+
+    def find_devices(self, lookup_names=True, duration=8, flush_cache=True):
+        self.lookup_names = lookup_names
+        self.is_inquiring = True
+        self.events = list(self.responses)
+        self.peer.send(b'x')
+
+    def process_event(self):
+        if self.events:
+            address, name = self.events.pop(0)
+            self.device_discovered(address, 0x0804, -60, name)
+            return
+        self.reader.recv(1)
+        self.is_inquiring = False
+        self.inquiry_complete()
+
+    def cancel_inquiry(self):
+        if not self.is_inquiring:
+            raise FakeBluetoothError('not inquiring')
+        self.is_inquiring = False
+
+
+def fake_pybluez(monkeypatch, lookup_name):
+    monkeypatch.setattr(ub, 'bluetooth', SimpleNamespace(
+        BluetoothError=FakeBluetoothError, DeviceDiscoverer=FakeDiscoverer,
+        lookup_name=lookup_name))
+
+
+def test_inquiry_reports_devices_before_name_lookup(monkeypatch):
+    monkeypatch.setattr(FakeDiscoverer, 'responses', [('00:16:53:00:00:01', None),
+                                                      ('00:16:53:00:00:02', b'Phone')])
+    events = []
+
+    def lookup_name(address, timeout=10):
+        events.append(('lookup', address))
+        return 'NXT'
+
+    fake_pybluez(monkeypatch, lookup_name)
+    ub.bt_inquiry(lambda address, name: events.append((address, name)), threading.Event())
+    assert events == [('00:16:53:00:00:01', '00:16:53:00:00:01'),
+                      ('00:16:53:00:00:02', 'Phone'),
+                      ('lookup', '00:16:53:00:00:01'),
+                      ('00:16:53:00:00:01', 'NXT')]
+
+
+def test_cancel_during_name_lookup(monkeypatch):
+    monkeypatch.setattr(FakeDiscoverer, 'responses', [('00:16:53:00:00:01', None),
+                                                      ('00:16:53:00:00:03', None)])
+    cancelled = threading.Event()
+    found = []
+
+    def lookup_name(address, timeout=10):
+        cancelled.set()    # the session connects while names are looked up
+        return 'NXT'
+
+    fake_pybluez(monkeypatch, lookup_name)
+    ub.bt_inquiry(lambda address, name: found.append(name), cancelled)
+    assert found == ['00:16:53:00:00:01', '00:16:53:00:00:03', 'NXT']
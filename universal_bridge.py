@@ -12,43 +12,67 @@ import base64
 import logging
 import sys
 import argparse
-import queue
+import datetime
+import errno
+import functools
+import importlib.util
+import select
 import threading
 import time
 from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+from collections import deque
 from typing import Optional, Dict, List
 
-# BLE support (cross-platform)
-try:
-    from bleak import BleakScanner, BleakClient
-    from bleak.backends.device import BLEDevice
-    BLEAK_AVAILABLE = True
-except ImportError:
-    BLEAK_AVAILABLE = False
-
-# Classic Bluetooth support
-try:
-    import bluetooth
-    PYBLUEZ_AVAILABLE = True
-except ImportError:
-    PYBLUEZ_AVAILABLE = False
-
-# Certificate generation
-try:
-    from cryptography import x509
-    from cryptography.x509.oid import NameOID
-    from cryptography.hazmat.primitives import hashes, serialization
-    from cryptography.hazmat.primitives.asymmetric import rsa
-    from cryptography.hazmat.backends import default_backend
-    import datetime
-    CRYPTO_AVAILABLE = True
-except ImportError:
-    CRYPTO_AVAILABLE = False
+# Transport backends are only located here; load_transport() imports them
+# when the first session of that kind arrives (bleak alone pulls in an
+# asyncio/D-Bus or pyobjc stack that dominates startup on a Raspberry Pi)
+BLEAK_AVAILABLE = importlib.util.find_spec('bleak') is not None          # BLE
+PYBLUEZ_AVAILABLE = importlib.util.find_spec('bluetooth') is not None    # BT Classic
+BleakScanner = BleakClient = bluetooth = None
+
+TRANSPORTS = ('ble', 'bt')
+
+
+def load_transport(name: str) -> bool:
+    """Import the backend for 'ble' or 'bt' on first use; False if unusable"""
+    global BleakScanner, BleakClient, bluetooth, BLEAK_AVAILABLE, PYBLUEZ_AVAILABLE
+    try:
+        if name == 'ble' and BleakClient is None and BLEAK_AVAILABLE:
+            start = time.perf_counter()
+            from bleak import BleakScanner, BleakClient
+            logger.debug(f"bleak loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+        elif name == 'bt' and bluetooth is None and PYBLUEZ_AVAILABLE:
+            start = time.perf_counter()
+            import bluetooth
+            logger.debug(f"PyBluez loaded in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except ImportError as e:
+        logger.error(f"Cannot load {name} backend: {e}")
+        if name == 'ble':
+            BLEAK_AVAILABLE = False
+        else:
+            PYBLUEZ_AVAILABLE = False
+    return BLEAK_AVAILABLE if name == 'ble' else PYBLUEZ_AVAILABLE
+
+# Certificate generation (cryptography is imported only when a certificate
+# has to be generated or parsed; see CertificateManager)
+CRYPTO_AVAILABLE = importlib.util.find_spec('cryptography') is not None
 
 # === CONFIGURATION ===
 SCRATCH_HOSTNAME = "device-manager.scratch.mit.edu"
 SCRATCH_PORT = 20110
 
+# Non-Scratch clients may negotiate this sub-protocol (or add ?binary=1)
+# to exchange raw packets in binary frames instead of base64 in JSON-RPC
+BINARY_SUBPROTOCOL = 'lego-binary'
+
+
+
+def select_binary_subprotocol(connection, offered):
+    """Pick the binary sub-protocol if offered; Scratch offers none and still connects"""
+    return BINARY_SUBPROTOCOL if BINARY_SUBPROTOCOL in offered else None
+
+
 # Logging
 logging.basicConfig(
     level=logging.INFO,
@@ -67,20 +91,28 @@ class CertificateManager:
         self.cert_dir = self.homedir / ".local/share/scratch-link"
         self.cert_path = self.cert_dir / "scratch-device-manager.cer"
         self.key_path = self.cert_dir / "scratch-device-manager.key"
+        # Validity window of the current certificate, so startup need not parse it
+        self.expiry_path = self.cert_dir / "scratch-device-manager.expiry"
     
     def generate_cert(self):
         """Generate self-signed certificate"""
-        if not CRYPTO_AVAILABLE:
-            logger.error("cryptography library not available")
-            return False
-        
-        self.cert_dir.mkdir(parents=True, exist_ok=True)
-        
         if self.cert_path.exists() and self.key_path.exists():
             if self._is_valid():
                 logger.debug("Valid certificate exists")
                 return True
         
+        try:
+            from cryptography import x509
+            from cryptography.x509.oid import NameOID
+            from cryptography.hazmat.primitives import hashes, serialization
+            from cryptography.hazmat.primitives.asymmetric import rsa
+            from cryptography.hazmat.backends import default_backend
+        except ImportError:
+            logger.error("cryptography library not available")
+            return False
+        
+        self.cert_dir.mkdir(parents=True, exist_ok=True)
+        
         logger.info("Generating SSL certificate...")
         
         # Generate private key
@@ -125,18 +157,50 @@ class CertificateManager:
                 encryption_algorithm=serialization.NoEncryption()
             ))
         
+        self._save_expiry(cert.not_valid_before_utc, cert.not_valid_after_utc)
         logger.info(f"✓ Certificate: {self.cert_path}")
         self._show_install_instructions()
         return True
     
     def _is_valid(self) -> bool:
+        window = self._load_expiry()
+        if window is None:
+            try:
+                from cryptography import x509
+                from cryptography.hazmat.backends import default_backend
+                with open(self.cert_path, "rb") as f:
+                    cert = x509.load_pem_x509_certificate(f.read(), default_backend())
+            except ImportError:
+                logger.warning("cryptography not available, using certificate unchecked")
+                return True
+            except:
+                return False
+            window = (cert.not_valid_before_utc.timestamp(),
+                      cert.not_valid_after_utc.timestamp())
+            self._save_expiry(cert.not_valid_before_utc, cert.not_valid_after_utc)
+        
+        not_before, not_after = window
+        return not_before <= time.time() <= not_after
+    
+    def _load_expiry(self):
+        """Cached (not_before, not_after) if it belongs to the current cert file"""
         try:
-            with open(self.cert_path, "rb") as f:
-                cert = x509.load_pem_x509_certificate(f.read(), default_backend())
-            now = datetime.datetime.now(datetime.UTC)
-            return cert.not_valid_before_utc <= now <= cert.not_valid_after_utc
-        except:
-            return False
+            cached = json.loads(self.expiry_path.read_text())
+            if cached['cert_mtime_ns'] != self.cert_path.stat().st_mtime_ns:
+                return None
+            return cached['not_before'], cached['not_after']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def _save_expiry(self, not_before: datetime.datetime, not_after: datetime.datetime):
+        try:
+            self.expiry_path.write_text(json.dumps({
+                'cert_mtime_ns': self.cert_path.stat().st_mtime_ns,
+                'not_before': not_before.timestamp(),
+                'not_after': not_after.timestamp()
+            }))
+        except OSError as e:
+            logger.debug(f"Could not cache certificate expiry: {e}")
     
     def _show_install_instructions(self):
         logger.info("\n" + "="*70)
@@ -173,39 +237,69 @@ class CertificateManager:
 
 
 # === SESSION BASE ===
+# Queue marker: the frame is looked up in Session.latest_frames at send time
+LATEST = object()
+
 class Session:
-    """Base session class"""
+    """Base session class
+
+    An inbound reader handles requests as they arrive while a sender task
+    drains an asyncio.Queue of outgoing frames. notify() may be called from
+    any thread (bleak callbacks, RFCOMM receive thread); it hands the frame
+    to the event loop with call_soon_threadsafe, so nothing polls.
+    """
+    
+    # Slow methods that run beside the ordered lane, one at a time each.
+    # Every other request (read, write, send, start/stopNotifications, ...)
+    # goes through one lane per session in arrival order, so a write can
+    # never overtake the startNotifications sent before it.
+    out_of_band = ('discover', 'connect')
     
-    def __init__(self, websocket, loop):
+    # Pack frames that are ready together into one JSON-RPC batch array
+    # (only for clients that understand batches; Scratch does not)
+    batch_notifications = False
+    max_batch = 64
+    
+    def __init__(self, websocket, loop, binary: bool = False):
         self.websocket = websocket
         self.loop = loop
-        self.notification_queue = queue.Queue()
+        self.binary = binary
+        self.outbound: asyncio.Queue = asyncio.Queue()
         self.status = "initial"
+        self.method_locks: Dict[str, asyncio.Lock] = {
+            method: asyncio.Lock() for method in self.out_of_band
+        }
+        # asyncio.Lock wakes waiters first-in first-out
+        self.lane = asyncio.Lock()
+        self.request_tasks: set = set()
+        self.latest_frames: Dict[str, str] = {}
     
     async def handle(self):
         """Main session loop"""
         logger.debug("Session started")
+        sender_task = asyncio.create_task(self._sender())
         
-        while True:
-            try:
-                try:
-                    req = await asyncio.wait_for(self.websocket.recv(), 0.01)
-                    await self._handle_request(req)
-                except asyncio.TimeoutError:
-                    pass
-                
-                await self._send_notifications()
+        try:
+            async for req in self.websocket:
+                if isinstance(req, bytes):
+                    await self.handle_binary(req)
+                else:
+                    # A slow discover/connect must not hold up later requests
+                    task = asyncio.create_task(self._handle_request(req))
+                    self.request_tasks.add(task)
+                    task.add_done_callback(self.request_tasks.discard)
                 
                 if self.status == "done":
                     break
                 
-                await asyncio.sleep(0.01)
-                
-            except websockets.ConnectionClosedError:
-                logger.info("Client disconnected")
-                break
-        
-        self.close()
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            logger.info("Client disconnected")
+            sender_task.cancel()
+            for task in list(self.request_tasks):
+                task.cancel()
+            self.close()
     
     async def _handle_request(self, req_str: str):
         try:
@@ -217,7 +311,8 @@ class Session:
             
             method = req.get('method')
             params = req.get('params', {})
-            result = await self.handle_method(method, params)
+            async with self.method_locks.get(method, self.lane):
+                result = await self.handle_method(method, params)
             
             response = {'jsonrpc': '2.0'}
             if 'id' in req:
@@ -228,7 +323,8 @@ class Session:
             else:
                 response['result'] = result
             
-            await self.websocket.send(json.dumps(response))
+            # Same queue as notifications, so ordering is preserved
+            self._enqueue((None, json.dumps(response)))
             
         except Exception as e:
             logger.error(f"Request error: {e}")
@@ -236,37 +332,270 @@ class Session:
     async def handle_method(self, method: str, params: dict):
         return {'error': {'message': 'Not implemented'}}
     
-    async def _send_notifications(self):
-        while not self.notification_queue.empty():
-            method, params = self.notification_queue.get()
-            notification = {
-                'jsonrpc': '2.0',
-                'method': method,
-                'params': params
-            }
-            await self.websocket.send(json.dumps(notification))
+    async def handle_binary(self, data: bytes):
+        """Raw binary frame from a client in binary mode"""
+        logger.debug(f"Ignoring {len(data)}-byte binary frame")
+    
+    def _frame(self, item: tuple):
+        """Turn a queue item into a frame (str or bytes), None if superseded"""
+        method, params = item
+        if method is None:
+            # Pre-encoded frame (JSON text or raw binary packet)
+            return params
+        if method is LATEST:
+            return self.latest_frames.pop(params, None)
+        return json.dumps({
+            'jsonrpc': '2.0',
+            'method': method,
+            'params': params
+        })
+    
+    def _pack(self, frames: list) -> list:
+        """Join runs of JSON text frames into batch arrays"""
+        if len(frames) < 2:
+            return frames
+        packed, texts = [], []
+        for frame in frames + [None]:
+            if isinstance(frame, str):
+                texts.append(frame)
+                continue
+            if texts:
+                packed.append(texts[0] if len(texts) == 1 else '[' + ','.join(texts) + ']')
+                texts = []
+            if frame is not None:
+                packed.append(frame)
+        return packed
+    
+    async def _sender(self):
+        """Send queued responses, notifications and raw frames in order"""
+        while True:
+            frames = [self._frame(await self.outbound.get())]
+            if self.batch_notifications:
+                while not self.outbound.empty() and len(frames) < self.max_batch:
+                    frames.append(self._frame(self.outbound.get_nowait()))
+            
+            try:
+                for frame in self._pack([f for f in frames if f is not None]):
+                    await self.websocket.send(frame)
+            except websockets.ConnectionClosed:
+                break
+            except Exception as e:
+                logger.error(f"Send error: {e}")
+    
+    def _enqueue(self, item: tuple):
+        """Queue an outgoing frame; safe to call from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self.outbound.put_nowait, item)
+        except RuntimeError:
+            pass  # Event loop already closed
     
     def notify(self, method: str, params: dict):
-        self.notification_queue.put((method, params))
+        self._enqueue((method, params))
+    
+    def send_raw(self, data: bytes):
+        """Queue a raw packet as one binary frame"""
+        self._enqueue((None, data))
+    
+    def send_latest(self, key: str, frame: str):
+        """Queue a frame that replaces any unsent frame with the same key"""
+        try:
+            self.loop.call_soon_threadsafe(self._put_latest, key, frame)
+        except RuntimeError:
+            pass
+    
+    def _put_latest(self, key: str, frame: str):
+        if key not in self.latest_frames:
+            self.outbound.put_nowait((LATEST, key))
+        self.latest_frames[key] = frame
     
     def close(self):
         pass
 
 
+# === LINK POOL ===
+class LinkPool:
+    """Bridge-wide pool of device links that outlive their WebSocket session
+
+    When a session closes, its link (BleakClient or RFCOMM socket) is parked
+    under the device address for `grace` seconds instead of being torn down;
+    a session connecting to the same device in that window takes it over
+    (e.g. after a page reload). A grace of 0 disables pooling.
+    """
+    
+    def __init__(self, grace: float = 30.0):
+        self.grace = grace
+        self.idle: Dict[str, tuple] = {}
+    
+    def take(self, key: str):
+        """Return a parked link for key, or None"""
+        item = self.idle.pop(key, None)
+        if item is None:
+            return None
+        link, timer, closer = item
+        timer.cancel()
+        logger.info(f"♻️  Reattaching warm link {key}")
+        return link
+    
+    def park(self, key: str, link, closer) -> bool:
+        """Keep link alive for the grace period; closer(link) tears it down"""
+        if self.grace <= 0:
+            return False
+        timer = asyncio.get_running_loop().call_later(self.grace, self._expire, key)
+        self.idle[key] = (link, timer, closer)
+        logger.info(f"⏳ Keeping link {key} for {self.grace:g}s")
+        return True
+    
+    def discard(self, link, closer):
+        """Tear down a link that cannot be reused"""
+        try:
+            closer(link)
+        except Exception as e:
+            logger.debug(f"Link close failed: {e}")
+    
+    def _expire(self, key: str):
+        item = self.idle.pop(key, None)
+        if item:
+            link, _, closer = item
+            logger.info(f"🔌 Closing idle link {key}")
+            self.discard(link, closer)
+
+
+link_pool = LinkPool()
+
+
+# === BLE DEVICE REGISTRY ===
+class BLEDeviceRegistry:
+    """Devices seen by one scanner shared by all BLE sessions
+
+    Entries are keyed by address and get a peripheralId that stays stable
+    for as long as the device keeps advertising. RSSI and name are updated
+    from every advertisement; entries not seen for `ttl` seconds are evicted,
+    except held ones: a connected or parked hub stops advertising but must
+    stay listed and connectable under the same peripheralId.
+    
+    The scanner runs only while some session is discovering (has a listener
+    registered); entries outlive it for `ttl` seconds, so a reload still
+    gets cached results at once.
+    """
+    
+    def __init__(self, ttl: float = 30.0, scanning_mode: str = 'active'):
+        self.ttl = ttl
+        self.scanning_mode = scanning_mode
+        self.entries: Dict[str, dict] = {}
+        self.by_id: Dict[int, str] = {}
+        self.next_id = 0
+        self.listeners: set = set()
+        self.held: set = set()
+        self.scanner = None
+        self.start_lock = asyncio.Lock()
+    
+    async def start(self):
+        """Start the shared scanner once; later calls return immediately"""
+        async with self.start_lock:
+            if self.scanner is not None:
+                return
+            logger.info(f"🔍 Starting shared BLE scanner ({self.scanning_mode})")
+            self.scanner = BleakScanner(
+                detection_callback=self._on_detection,
+                scanning_mode=self.scanning_mode
+            )
+            await self.scanner.start()
+    
+    async def stop(self):
+        async with self.start_lock:
+            if self.scanner is not None:
+                await self.scanner.stop()
+                self.scanner = None
+    
+    def add_listener(self, listener):
+        self.listeners.add(listener)
+    
+    def remove_listener(self, listener):
+        """Unregister a discovering session; the last one out stops the scanner"""
+        if listener in self.listeners:
+            self.listeners.discard(listener)
+            if not self.listeners and self.scanner is not None:
+                asyncio.create_task(self._stop_if_idle())
+    
+    async def _stop_if_idle(self):
+        async with self.start_lock:
+            if self.listeners or self.scanner is None:
+                return
+            logger.info("🔍 Stopping shared BLE scanner (no session discovering)")
+            scanner, self.scanner = self.scanner, None
+            await scanner.stop()
+    
+    def _on_detection(self, device, advertisement_data):
+        entry = self.entries.get(device.address)
+        if entry is None:
+            entry = {'id': self.next_id, 'address': device.address}
+            self.entries[device.address] = entry
+            self.by_id[self.next_id] = device.address
+            self.next_id += 1
+            is_new = True
+        else:
+            is_new = False
+        
+        entry['device'] = device
+        entry['name'] = device.name or advertisement_data.local_name or entry.get('name')
+        entry['rssi'] = advertisement_data.rssi
+        entry['last_seen'] = time.monotonic()
+        
+        if is_new:
+            for listener in list(self.listeners):
+                listener(entry)
+    
+    def hold(self, address: str):
+        """Exempt address from eviction while a link to it is open"""
+        self.held.add(address)
+    
+    def release(self, address: str):
+        self.held.discard(address)
+    
+    def evict_stale(self):
+        cutoff = time.monotonic() - self.ttl
+        for address, entry in list(self.entries.items()):
+            if entry['last_seen'] < cutoff and address not in self.held:
+                del self.entries[address]
+                del self.by_id[entry['id']]
+    
+    def current(self) -> List[dict]:
+        self.evict_stale()
+        return list(self.entries.values())
+    
+    def get(self, peripheral_id: int) -> Optional[dict]:
+        address = self.by_id.get(peripheral_id)
+        return self.entries.get(address) if address else None
+
+
 # === BLE SESSION ===
 class BLESession(Session):
     """BLE session for micro:bit, LEGO WeDo/Boost/Powered Up, etc."""
     
-    found_devices: List[BLEDevice] = []
-    scan_lock = asyncio.Lock()
+    registry = BLEDeviceRegistry()
     nr_connected = 0
+    # Write type when the client sends no withResponse; 'auto' uses
+    # write-without-response wherever the characteristic allows it
+    write_mode = 'auto'
+    # Per-characteristic "latest value only" delivery of notifications:
+    # 'off', 'always', or 'auto' (only while more than one BLE session is open)
+    notify_latest = 'off'
     
-    def __init__(self, websocket, loop):
-        super().__init__(websocket, loop)
+    def __init__(self, websocket, loop, binary: bool = False):
+        super().__init__(websocket, loop, binary)
         self.client: Optional[BleakClient] = None
         self.device_name = None
+        self.address = None
+        # Shared with the pool: notifications are routed to link['session']
+        self.link: Optional[dict] = None
+        self.templates: Dict[str, tuple] = {}
         self.notification_handles: Dict[str, Dict] = {}
         self.discovery_task = None
+        self.discovery_filters: List[dict] = []
+        self.reported_ids: set = set()
+        self.write_response: Dict[str, bool] = {}
+        self.write_count = 0
+        self.write_time = 0.0
     
     async def handle_method(self, method: str, params: dict):
         if method == 'discover':
@@ -288,26 +617,17 @@ class BLESession(Session):
         if not BLEAK_AVAILABLE:
             return {'error': {'message': 'Bleak not available'}}
         
-        logger.info("🔍 Scanning BLE devices (10s)...")
-        
         try:
-            async with self.scan_lock:
-                BLESession.found_devices.clear()
-                devices = await BleakScanner.discover(timeout=10.0, return_adv=False)
-                
-                filters = params.get('filters', [])
-                
-                for device in devices:
-                    if self._matches_filter(device, filters):
-                        BLESession.found_devices.append(device)
-                        self.notify('didDiscoverPeripheral', {
-                            'peripheralId': len(BLESession.found_devices) - 1,
-                            'name': device.name or 'Unknown',
-                            'rssi': getattr(device, 'rssi', -50)
-                        })
-                        logger.info(f"  ✓ {device.name} ({device.address})")
-            
+            self.discovery_filters = params.get('filters', [])
             self.status = "discovery"
+            # Registered first so the scanner keeps running while it starts
+            self.registry.add_listener(self._report_device)
+            await self.registry.start()
+            
+            # Cached devices (including held ones: connected elsewhere or
+            # parked in link_pool) are reported right away, new ones as they appear
+            for entry in self.registry.current():
+                self._report_device(entry)
             
             if not self.discovery_task:
                 self.discovery_task = asyncio.create_task(self._discovery_loop())
@@ -316,55 +636,84 @@ class BLESession(Session):
             
         except Exception as e:
             logger.error(f"Discovery failed: {e}")
+            self.registry.remove_listener(self._report_device)
             return {'error': {'message': str(e)}}
     
-    def _matches_filter(self, device: BLEDevice, filters: List[dict]) -> bool:
+    def _report_device(self, entry: dict):
+        if self.status != "discovery" or not self._matches_filter(entry['name'], self.discovery_filters):
+            return
+        if entry['id'] not in self.reported_ids:
+            self.reported_ids.add(entry['id'])
+            logger.info(f"  ✓ {entry['name']} ({entry['address']})")
+        self.notify('didDiscoverPeripheral', {
+            'peripheralId': entry['id'],
+            'name': entry['name'] or 'Unknown',
+            'rssi': entry['rssi']
+        })
+    
+    def _matches_filter(self, name: Optional[str], filters: List[dict]) -> bool:
         if not filters:
-            name = (device.name or '').lower()
+            name = (name or '').lower()
             return any(k in name for k in ['bbc', 'micro:bit', 'microbit', 
                                             'lego', 'lpf2', 'hub', 'wedo', 'boost'])
         
         for f in filters:
-            if 'namePrefix' in f and device.name:
-                if device.name.startswith(f['namePrefix']):
+            if 'namePrefix' in f and name:
+                if name.startswith(f['namePrefix']):
                     return True
-            if 'name' in f and device.name == f['name']:
+            if 'name' in f and name == f['name']:
                 return True
         
         return False
     
     async def _discovery_loop(self):
+        """Refresh RSSI of matching devices once a second"""
         while self.status == "discovery":
-            for device in BLESession.found_devices:
-                self.notify('didDiscoverPeripheral', {
-                    'peripheralId': BLESession.found_devices.index(device),
-                    'name': device.name or 'Unknown',
-                    'rssi': getattr(device, 'rssi', -50)
-                })
             await asyncio.sleep(1)
+            for entry in self.registry.current():
+                self._report_device(entry)
+    
+    def _stop_discovery(self):
+        self.registry.remove_listener(self._report_device)
+        if self.discovery_task:
+            self.discovery_task.cancel()
+            self.discovery_task = None
     
     async def _connect(self, params: dict):
         try:
             device_id = params.get('peripheralId', 0)
-            if device_id >= len(BLESession.found_devices):
+            entry = self.registry.get(device_id)
+            if entry is None:
                 return {'error': {'message': 'Invalid device ID'}}
             
-            device = BLESession.found_devices[device_id]
-            self.device_name = device.name or 'Unknown'
+            device = entry['device']
+            self.device_name = entry['name'] or 'Unknown'
+            self.address = entry['address']
             
-            logger.info(f"📱 Connecting to {self.device_name}...")
+            link = link_pool.take(f"ble:{self.address}")
+            if link and not link['client'].is_connected:
+                link = None
             
-            self.client = BleakClient(device)
-            await self.client.connect()
+            if link:
+                # Warm link: adopt the client and its live subscriptions
+                self.client = link['client']
+                for char_uuid, service_id in link['subscriptions'].items():
+                    self._add_notification_handle(service_id, char_uuid)
+            else:
+                logger.info(f"📱 Connecting to {self.device_name}...")
+                self.client = BleakClient(device)
+                await self.client.connect()
+                link = {'client': self.client, 'subscriptions': {}}
+            
+            link['session'] = self
+            self.link = link
+            self.registry.hold(self.address)
             
             logger.info(f"✓ Connected to {self.device_name}")
             
             self.status = "connected"
             BLESession.nr_connected += 1
-            
-            if self.discovery_task:
-                self.discovery_task.cancel()
-                self.discovery_task = None
+            self._stop_discovery()
             
             return None
             
@@ -408,8 +757,15 @@ class BLESession(Session):
             
             data = base64.b64decode(message) if encoding == 'base64' else message.encode()
             
-            await self.client.write_gatt_char(char_uuid, data, response=True)
-            logger.debug(f"Wrote {len(data)} bytes")
+            response = params.get('withResponse')
+            if response is None:
+                response = self._default_write_response(char_uuid)
+            
+            started = time.monotonic()
+            await self.client.write_gatt_char(char_uuid, data, response=bool(response))
+            self.write_time += time.monotonic() - started
+            self.write_count += 1
+            logger.debug(f"Wrote {len(data)} bytes ({'with' if response else 'without'} response)")
             
             return len(data)
             
@@ -417,6 +773,20 @@ class BLESession(Session):
             logger.error(f"Write failed: {e}")
             return {'error': {'message': str(e)}}
     
+    def _default_write_response(self, char_uuid: str) -> bool:
+        """Write type when the client did not ask for one (cached per characteristic)"""
+        if char_uuid not in self.write_response:
+            if self.write_mode == 'response':
+                self.write_response[char_uuid] = True
+            elif self.write_mode == 'no-response':
+                self.write_response[char_uuid] = False
+            else:
+                char = self.client.services.get_characteristic(char_uuid)
+                self.write_response[char_uuid] = not (
+                    char and 'write-without-response' in char.properties
+                )
+        return self.write_response[char_uuid]
+    
     async def _start_notifications(self, params: dict):
         if not self.client or not self.client.is_connected:
             return {'error': {'message': 'Not connected'}}
@@ -424,19 +794,18 @@ class BLESession(Session):
         try:
             service_id = params.get('serviceId')
             char_uuid = params.get('characteristicId')
+            self._add_notification_handle(service_id, char_uuid)
             
-            self.notification_handles[char_uuid] = {
-                'serviceId': service_id,
-                'characteristicId': char_uuid
-            }
-            
-            def callback(sender, data):
-                p = self.notification_handles[char_uuid].copy()
-                p['message'] = base64.b64encode(data).decode('ascii')
-                p['encoding'] = 'base64'
-                self.notify('characteristicDidChange', p)
-            
-            await self.client.start_notify(char_uuid, callback)
+            link = self.link
+            if char_uuid not in link['subscriptions']:
+                # Routed through the link so a reattached session receives it
+                def callback(sender, data):
+                    session = link.get('session')
+                    if session:
+                        session._on_notification(char_uuid, data)
+                
+                await self.client.start_notify(char_uuid, callback)
+                link['subscriptions'][char_uuid] = service_id
             logger.debug(f"✓ Notifications: {char_uuid}")
             
             return None
@@ -445,6 +814,41 @@ class BLESession(Session):
             logger.error(f"Start notifications failed: {e}")
             return {'error': {'message': str(e)}}
     
+    def _add_notification_handle(self, service_id, char_uuid: str):
+        self.notification_handles[char_uuid] = {
+            'serviceId': service_id,
+            'characteristicId': char_uuid
+        }
+        
+        # Serialise everything but the payload once; base64 needs no escaping
+        template = json.dumps({
+            'jsonrpc': '2.0',
+            'method': 'characteristicDidChange',
+            'params': {
+                'serviceId': service_id,
+                'characteristicId': char_uuid,
+                'message': '@@MESSAGE@@',
+                'encoding': 'base64'
+            }
+        })
+        self.templates[char_uuid] = tuple(template.split('@@MESSAGE@@'))
+    
+    def _on_notification(self, char_uuid: str, data: bytes):
+        template = self.templates.get(char_uuid)
+        if template is None:
+            return
+        head, tail = template
+        frame = head + base64.b64encode(data).decode('ascii') + tail
+        if self._latest_only():
+            self.send_latest(char_uuid, frame)
+        else:
+            self._enqueue((None, frame))
+    
+    def _latest_only(self) -> bool:
+        if self.notify_latest == 'always':
+            return True
+        return self.notify_latest == 'auto' and BLESession.nr_connected > 1
+    
     async def _stop_notifications(self, params: dict):
         if not self.client or not self.client.is_connected:
             return {'error': {'message': 'Not connected'}}
@@ -453,6 +857,8 @@ class BLESession(Session):
             char_uuid = params.get('characteristicId')
             await self.client.stop_notify(char_uuid)
             
+            self.link['subscriptions'].pop(char_uuid, None)
+            self.templates.pop(char_uuid, None)
             if char_uuid in self.notification_handles:
                 del self.notification_handles[char_uuid]
             
@@ -464,14 +870,26 @@ class BLESession(Session):
     
     def close(self):
         self.status = "done"
-        
-        if self.discovery_task:
-            self.discovery_task.cancel()
+        self._stop_discovery()
         
         if self.client and self.client.is_connected:
-            asyncio.create_task(self._disconnect())
+            self.link['session'] = None
+            address = self.address
+            
+            def close_link(link):
+                self.registry.release(address)
+                asyncio.create_task(link['client'].disconnect())
+            
+            if not link_pool.park(f"ble:{address}", self.link, close_link):
+                self.registry.release(address)
+                asyncio.create_task(self._disconnect())
             BLESession.nr_connected -= 1
+        elif self.link:
+            self.registry.release(self.address)
         
+        if self.write_time > 0:
+            logger.info(f"  {self.write_count} writes, "
+                        f"{self.write_count / self.write_time:.0f} writes/s achieved")
         logger.info("BLE session closed")
     
     async def _disconnect(self):
@@ -481,20 +899,180 @@ class BLESession(Session):
             pass
 
 
+# === NXT FRAMING ===
+NXT_MAX_TELEGRAM = 256
+
+
+class NXTFramer:
+    """Incremental framer for length-prefixed NXT telegrams
+
+    Chunks from recv() are appended to one bytearray and scanned in place
+    with an offset; consumed bytes are dropped once per feed rather than
+    once per telegram.
+    """
+    
+    def __init__(self):
+        self.buffer = bytearray()
+    
+    def feed(self, data: bytes) -> List[bytes]:
+        """Append data and return all complete telegrams (header included)"""
+        buf = self.buffer
+        buf += data
+        packets = []
+        pos, end = 0, len(buf)
+        
+        while end - pos >= 2:
+            length = buf[pos] | (buf[pos + 1] << 8)
+            if length > NXT_MAX_TELEGRAM or length == 0:
+                logger.warning(f"Invalid packet length: {length}")
+                pos += 2
+                continue
+            if end - pos < length + 2:
+                break
+            packets.append(bytes(buf[pos:pos + length + 2]))
+            pos += length + 2
+        
+        if pos:
+            del buf[:pos]
+        return packets
+    
+    def reset(self):
+        """Discard any partial telegram"""
+        self.buffer.clear()
+
+
+# NXT direct commands used by the bridge itself (BT length header included)
+NXT_KEEPALIVE = bytes([0x02, 0x00, 0x80, 0x0D])      # KEEPALIVE, no reply
+NXT_GET_BATTERY = bytes([0x02, 0x00, 0x00, 0x0B])    # GETBATTERYLEVEL
+NXT_OP_BATTERY = 0x0B
+
+
+def nxt_telegrams(data: bytes):
+    """Yield (command type, opcode) for each length-prefixed telegram in data"""
+    pos = 0
+    while pos + 4 <= len(data):
+        length = data[pos] | (data[pos + 1] << 8)
+        if length < 2:
+            break
+        yield data[pos + 2], data[pos + 3]
+        pos += length + 2
+
+
+def bt_would_block(e: Exception) -> bool:
+    """True if a PyBluez error is just EAGAIN on a non-blocking socket
+
+    PyBluez raises BluetoothError(errno, message) for every socket error,
+    older releases BluetoothError("(errno, 'message')"); anything other than
+    EAGAIN/EWOULDBLOCK means the link is gone.
+    """
+    code = getattr(e, 'errno', None)
+    if code is None and e.args:
+        code = e.args[0]
+        if isinstance(code, str) and code.startswith('('):
+            code = code[1:].split(',', 1)[0]
+        try:
+            code = int(code)
+        except (TypeError, ValueError):
+            return False
+    return code in (errno.EAGAIN, errno.EWOULDBLOCK)
+
+
+def bt_inquiry(on_found, cancelled: threading.Event, duration: int = 8):
+    """Blocking inquiry calling on_found(address, name) as devices answer
+
+    Uses PyBluez's DeviceDiscoverer where available (BlueZ) so results
+    stream in and the inquiry can be aborted; elsewhere falls back to
+    discover_devices(), which reports everything at the end. Devices are
+    reported by address as soon as they answer (an NXT's inquiry response
+    carries no name); names are looked up one by one afterwards and
+    reported again.
+    """
+    unnamed = []
+    
+    def found(address, name):
+        if isinstance(name, bytes):
+            name = name.decode('utf-8', errors='replace')
+        if not name:
+            unnamed.append(address)
+        on_found(address, name or address)
+    
+    if hasattr(bluetooth, 'DeviceDiscoverer'):
+        class Discoverer(bluetooth.DeviceDiscoverer):
+            done = False
+            
+            def device_discovered(self, address, device_class, rssi, name):
+                found(address, name)
+            
+            def inquiry_complete(self):
+                self.done = True
+        
+        # lookup_names=True would hold back every device without a name in
+        # its response until the whole inquiry is over
+        discoverer = Discoverer()
+        discoverer.find_devices(lookup_names=False, duration=duration, flush_cache=True)
+        while not discoverer.done:
+            if cancelled.is_set():
+                if discoverer.is_inquiring:
+                    discoverer.cancel_inquiry()
+                return
+            readable, _, _ = select.select([discoverer], [], [], 0.2)
+            if readable:
+                discoverer.process_event()
+    else:
+        for address in bluetooth.discover_devices(duration=duration, lookup_names=False,
+                                                  flush_cache=True):
+            if cancelled.is_set():
+                return
+            found(address, None)
+    
+    for address in unnamed:
+        if cancelled.is_set():
+            return
+        name = bluetooth.lookup_name(address, timeout=5)
+        if name:
+            on_found(address, name)
+
+
 # === BT CLASSIC SESSION ===
 class BTSession(Session):
     """Classic Bluetooth for LEGO NXT, etc."""
     
+    # (address, name) by peripheralId; ids stay stable for the bridge's lifetime
     found_devices = []
     scan_lock = threading.RLock()
     
-    def __init__(self, websocket, loop):
-        super().__init__(websocket, loop)
+    # Devices we have connected to before, reported before any inquiry runs
+    known_devices_path = Path.home() / ".local/share/scratch-link/bt-devices.json"
+    
+    # NXT keepalive: sent only after this many idle seconds (0 disables);
+    # every keepalive older than battery_max_age also refreshes the battery
+    keepalive_idle = 25.0
+    battery_max_age = 120.0
+    
+    def __init__(self, websocket, loop, binary: bool = False):
+        super().__init__(websocket, loop, binary)
         self.sock = None
         self.device_name = None
+        self.address = None
+        self.framer = NXTFramer()
+        self.reader_fd = None
+        self.link_lost = False
         self.receive_thread = None
-        self.keepalive_thread = None
         self.running = False
+        
+        self.discovery_task = None
+        self.inquiry_cancelled = threading.Event()
+        
+        # Outbound scheduler: one writer task owns the socket
+        self.tx: asyncio.Queue = asyncio.Queue()
+        self.writer_task = None
+        self.keepalive = False
+        self.last_activity = 0.0
+        
+        # Who asked for each outstanding battery reading ('bridge' or 'client')
+        self.battery_owners: deque = deque()
+        self.battery_mv = None
+        self.battery_time = 0.0
     
     async def handle_method(self, method: str, params: dict):
         if not PYBLUEZ_AVAILABLE:
@@ -506,37 +1084,81 @@ class BTSession(Session):
             return await self._connect(params)
         elif method == 'send':
             return await self._send(params)
+        elif method == 'getBattery':
+            return self._get_battery()
         
         return {'error': {'message': f'Unknown method: {method}'}}
     
     async def _discover(self, params: dict):
+        self._stop_discovery()
+        self.status = "discovery"
+        
+        # Known devices appear at once; the inquiry then streams the rest
+        for addr, name in self._load_known_devices().items():
+            self._report_bt_device(addr, name)
+        
+        self.inquiry_cancelled = threading.Event()
+        self.discovery_task = asyncio.create_task(self._inquiry(self.inquiry_cancelled))
+        return None
+    
+    async def _inquiry(self, cancelled: threading.Event):
         logger.info("🔍 Scanning Bluetooth Classic devices (8s)...")
         
-        try:
+        def on_found(addr, name):
+            self.loop.call_soon_threadsafe(self._report_bt_device, addr, name)
+        
+        def run():
+            # One inquiry at a time across sessions; waits in this thread
             with self.scan_lock:
-                BTSession.found_devices.clear()
-                
-                # Run discovery in executor (blocking operation)
-                devices = await self.loop.run_in_executor(
-                    None,
-                    lambda: bluetooth.discover_devices(duration=8, lookup_names=True, flush_cache=True)
-                )
-                
-                for addr, name in devices:
-                    BTSession.found_devices.append((addr, name))
-                    self.notify('didDiscoverPeripheral', {
-                        'peripheralId': len(BTSession.found_devices) - 1,
-                        'name': name,
-                        'rssi': -50
-                    })
-                    logger.info(f"  ✓ {name} ({addr})")
-            
-            self.status = "discovery"
-            return None
-            
+                if not cancelled.is_set():
+                    bt_inquiry(on_found, cancelled)
+        
+        try:
+            await self.loop.run_in_executor(None, run)
+            logger.debug("Inquiry finished")
         except Exception as e:
             logger.error(f"Discovery failed: {e}")
-            return {'error': {'message': str(e)}}
+    
+    def _report_bt_device(self, addr: str, name: str):
+        if self.status != "discovery":
+            return
+        for device_id, (known_addr, _) in enumerate(BTSession.found_devices):
+            if known_addr == addr:
+                BTSession.found_devices[device_id] = (addr, name)
+                break
+        else:
+            BTSession.found_devices.append((addr, name))
+            device_id = len(BTSession.found_devices) - 1
+        
+        self.notify('didDiscoverPeripheral', {
+            'peripheralId': device_id,
+            'name': name,
+            'rssi': -50
+        })
+        logger.info(f"  ✓ {name} ({addr})")
+    
+    def _stop_discovery(self):
+        """Abort a running inquiry; it slows down RFCOMM connection setup"""
+        self.inquiry_cancelled.set()
+        task, self.discovery_task = self.discovery_task, None
+        return task
+    
+    def _load_known_devices(self) -> Dict[str, str]:
+        try:
+            return json.loads(self.known_devices_path.read_text())
+        except (OSError, ValueError):
+            return {}
+    
+    def _remember_device(self, addr: str, name: str):
+        known = self._load_known_devices()
+        if known.get(addr) == name:
+            return
+        known[addr] = name
+        try:
+            self.known_devices_path.parent.mkdir(parents=True, exist_ok=True)
+            self.known_devices_path.write_text(json.dumps(known, indent=2))
+        except OSError as e:
+            logger.debug(f"Could not save known devices: {e}")
     
     async def _connect(self, params: dict):
         try:
@@ -546,38 +1168,42 @@ class BTSession(Session):
             
             addr, name = BTSession.found_devices[device_id]
             self.device_name = name
+            self.address = addr
             
-            logger.info(f"📱 Connecting to {name}...")
-            
-            # Create socket
-            self.sock = bluetooth.BluetoothSocket(bluetooth.RFCOMM)
+            inquiry = self._stop_discovery()
+            if inquiry:
+                # Wait (briefly) for the radio to leave inquiry mode
+                await asyncio.wait({inquiry}, timeout=1.0)
             
-            # Connect (blocking)
-            await self.loop.run_in_executor(
-                None,
-                lambda: self.sock.connect((addr, 1))
-            )
-            
-            self.sock.setblocking(False)
+            self.sock = link_pool.take(f"bt:{addr}")
+            if self.sock is None:
+                logger.info(f"📱 Connecting to {name}...")
+                
+                # Create socket
+                self.sock = bluetooth.BluetoothSocket(bluetooth.RFCOMM)
+                
+                # Connect (blocking)
+                await self.loop.run_in_executor(
+                    None,
+                    lambda: self.sock.connect((addr, 1))
+                )
+                
+                self.sock.setblocking(False)
             
             logger.info(f"✓ Connected to {name}")
+            self._remember_device(addr, name)
             
             self.status = "connected"
             self.running = True
             
-            # Start receive thread
-            self.receive_thread = threading.Thread(
-                target=self._receive_loop, daemon=True
-            )
-            self.receive_thread.start()
+            self._start_receiving()
             
-            # Start keepalive for NXT
-            if 'NXT' in name.upper():
-                self.keepalive_thread = threading.Thread(
-                    target=self._keepalive_loop, daemon=True
-                )
-                self.keepalive_thread.start()
-                logger.info("  ⏰ Keepalive enabled for NXT")
+            # Keepalive for NXT, scheduled by the writer when the link is idle
+            self.keepalive = 'NXT' in name.upper() and self.keepalive_idle > 0
+            if self.keepalive:
+                logger.info(f"  ⏰ Keepalive after {self.keepalive_idle:g}s idle")
+            self.last_activity = time.monotonic()
+            self.writer_task = asyncio.create_task(self._writer())
             
             return None
             
@@ -593,120 +1219,229 @@ class BTSession(Session):
             message = params.get('message', '')
             data = base64.b64decode(message)
             
-            # Send in executor (blocking)
-            await self.loop.run_in_executor(
-                None,
-                lambda: self.sock.send(data)
-            )
-            
-            logger.debug(f"Sent: {data.hex().upper()}")
+            sent = self.loop.create_future()
+            self.tx.put_nowait((data, sent))
+            await sent
             return len(data)
             
         except Exception as e:
             logger.error(f"Send failed: {e}")
             return {'error': {'message': str(e)}}
     
+    async def handle_binary(self, data: bytes):
+        """Binary frames carry raw telegrams to send"""
+        if not self.sock:
+            logger.warning("Binary frame before connect, ignored")
+            return
+        self.tx.put_nowait((data, None))
+    
+    async def _writer(self):
+        """Send queued telegrams one at a time; keepalive when the link idles"""
+        while True:
+            timeout = None
+            if self.keepalive and self.running and not self.link_lost:
+                idle = time.monotonic() - self.last_activity
+                timeout = max(0.0, self.keepalive_idle - idle)
+            
+            owner = 'client'
+            try:
+                data, sent = await asyncio.wait_for(self.tx.get(), timeout)
+            except asyncio.TimeoutError:
+                data, sent = self._keepalive_telegram(), None
+                owner = 'bridge'
+            
+            if self.link_lost or not self.running:
+                # No keepalives or battery refreshes into a dead socket;
+                # client sends fail instead of waiting forever
+                if sent and not sent.done():
+                    sent.set_exception(ConnectionError(f"Link to {self.device_name} lost"))
+                continue
+            
+            try:
+                await self.loop.run_in_executor(None, self.sock.send, data)
+                self.last_activity = time.monotonic()
+                self._track_battery_requests(data, owner)
+                logger.debug(f"Sent: {data.hex().upper()}")
+                if sent and not sent.done():
+                    sent.set_result(None)
+            except Exception as e:
+                if sent and not sent.done():
+                    sent.set_exception(e)
+                else:
+                    logger.error(f"Send failed: {e}")
+    
+    def _keepalive_telegram(self) -> bytes:
+        """No-reply KEEPALIVE, or a battery read when the cached value is stale"""
+        if time.monotonic() - self.battery_time > self.battery_max_age:
+            logger.debug("⏰ Keepalive (battery refresh)")
+            return NXT_GET_BATTERY
+        logger.debug("⏰ Keepalive")
+        return NXT_KEEPALIVE
+    
+    def _track_battery_requests(self, data: bytes, owner: str):
+        for cmd_type, opcode in nxt_telegrams(data):
+            if cmd_type == 0x00 and opcode == NXT_OP_BATTERY:
+                self.battery_owners.append(owner)
+    
+    def _get_battery(self):
+        """Last battery reading, without a round trip to the brick"""
+        if self.battery_mv is None:
+            return {'millivolts': None, 'age': None}
+        return {
+            'millivolts': self.battery_mv,
+            'age': round(time.monotonic() - self.battery_time, 1)
+        }
+    
+    def _start_receiving(self):
+        """Have the event loop call us when the RFCOMM socket is readable"""
+        self.framer.reset()
+        try:
+            fd = self.sock.fileno()
+            self.loop.add_reader(fd, self._on_readable)
+            self.reader_fd = fd
+        except (NotImplementedError, AttributeError, ValueError):
+            # e.g. Windows proactor loop: block in select() on a thread instead
+            self.receive_thread = threading.Thread(
+                target=self._receive_loop, daemon=True
+            )
+            self.receive_thread.start()
+    
+    def _stop_receiving(self):
+        if self.reader_fd is not None:
+            self.loop.remove_reader(self.reader_fd)
+            self.reader_fd = None
+        if self.receive_thread:
+            self.receive_thread.join(timeout=0.5)
+    
+    def _on_readable(self):
+        """Drain the non-blocking socket and deliver complete telegrams"""
+        while True:
+            try:
+                chunk = self.sock.recv(1024)
+            except (BlockingIOError, InterruptedError):
+                return
+            except (bluetooth.BluetoothError, OSError) as e:
+                if bt_would_block(e):
+                    return  # Nothing left to read
+                logger.error(f"Receive error: {e}")
+                chunk = b''
+            
+            if not chunk:
+                logger.warning(f"Link to {self.device_name} closed")
+                self._stop_receiving()
+                self.running = False
+                self.link_lost = True
+                return
+            
+            for packet in self.framer.feed(chunk):
+                self._deliver(packet)
+    
     def _receive_loop(self):
-        """Background thread to receive NXT packets"""
+        """Fallback receive thread for loops without add_reader"""
         logger.debug("Receive thread started")
         
         while self.running:
             try:
-                # Read length header (2 bytes, little-endian)
-                header = b''
-                while len(header) < 2 and self.running:
-                    try:
-                        chunk = self.sock.recv(2 - len(header))
-                        if chunk:
-                            header += chunk
-                    except bluetooth.BluetoothError:
-                        time.sleep(0.01)
-                
-                if len(header) < 2:
+                readable, _, _ = select.select([self.sock], [], [], 0.2)
+                if not readable:
                     continue
-                
-                length = header[0] | (header[1] << 8)
-                
-                if length > 256 or length == 0:
-                    logger.warning(f"Invalid packet length: {length}")
-                    continue
-                
-                # Read data
-                data = b''
-                while len(data) < length and self.running:
-                    try:
-                        chunk = self.sock.recv(length - len(data))
-                        if chunk:
-                            data += chunk
-                    except bluetooth.BluetoothError:
-                        time.sleep(0.01)
-                
-                if len(data) < length:
-                    logger.warning(f"Incomplete packet: got {len(data)}, expected {length}")
+                chunk = self.sock.recv(1024)
+                if not chunk:
+                    break
+                for packet in self.framer.feed(chunk):
+                    self._deliver(packet)
+            except bluetooth.BluetoothError as e:
+                if bt_would_block(e):
                     continue
-                
-                packet = header + data
-                logger.debug(f"Received: {packet.hex().upper()}")
-                
-                # Notify Scratch
-                self.notify('didReceiveMessage', {
-                    'message': base64.b64encode(packet).decode('ascii'),
-                    'encoding': 'base64'
-                })
-                
+                if self.running:
+                    logger.error(f"Receive error: {e}")
+                break
             except Exception as e:
                 if self.running:
                     logger.error(f"Receive error: {e}")
                 break
+        
+        if self.running:
+            # Dead socket, not a close(): stop here rather than spin on it
+            logger.warning(f"Link to {self.device_name} closed")
+            self.running = False
+            self.link_lost = True
     
-    def _keepalive_loop(self):
-        """Send periodic battery requests to keep NXT alive"""
-        logger.debug("Keepalive thread started")
+    def _deliver(self, packet: bytes):
+        logger.debug(f"Received: {packet.hex().upper()}")
+        self.last_activity = time.monotonic()
         
-        while self.running:
-            time.sleep(25)  # Every 25 seconds
-            
-            if self.sock and self.running:
-                try:
-                    # NXT battery level request: [length LSB, length MSB, 0x00, 0x0B]
-                    keepalive = bytes([0x02, 0x00, 0x00, 0x0B])
-                    self.sock.send(keepalive)
-                    logger.debug("⏰ Keepalive sent")
-                except Exception as e:
-                    logger.warning(f"Keepalive failed: {e}")
+        if len(packet) >= 7 and packet[2] == 0x02 and packet[3] == NXT_OP_BATTERY:
+            if packet[4] == 0x00:
+                self.battery_mv = packet[5] | (packet[6] << 8)
+                self.battery_time = time.monotonic()
+            owner = self.battery_owners.popleft() if self.battery_owners else 'client'
+            if owner == 'bridge':
+                return
+        
+        # Notify Scratch
+        if self.binary:
+            self.send_raw(packet)
+        else:
+            self.notify('didReceiveMessage', {
+                'message': base64.b64encode(packet).decode('ascii'),
+                'encoding': 'base64'
+            })
     
     def close(self):
         self.running = False
         self.status = "done"
+        self._stop_discovery()
+        
+        if self.writer_task:
+            self.writer_task.cancel()
+            self.writer_task = None
         
         if self.sock:
-            try:
-                self.sock.close()
-            except:
-                pass
+            # Once nothing reads from the socket it can go to the next session
+            self._stop_receiving()
+            if self.link_lost or (self.receive_thread and self.receive_thread.is_alive()) or \
+                    not link_pool.park(f"bt:{self.address}", self.sock, lambda sock: sock.close()):
+                link_pool.discard(self.sock, lambda sock: sock.close())
             self.sock = None
         
         logger.info(f"BT session closed: {self.device_name}")
 
 
 # === WEBSOCKET HANDLER ===
-async def ws_handler(websocket, path):
+async def ws_handler(websocket, path=None, transports=TRANSPORTS):
     """Route connections to BLE or BT session"""
+    if path is None:
+        # websockets >= 10 passes only the connection
+        path = websocket.request.path
     session_types = {
-        '/scratch/ble': BLESession,
-        '/scratch/bt': BTSession
+        '/scratch/ble': ('ble', BLESession),
+        '/scratch/bt': ('bt', BTSession)
     }
     
     try:
         logger.info(f"📡 {path} from {websocket.remote_address}")
         
-        if path not in session_types:
+        url = urlparse(path)
+        if url.path not in session_types:
             logger.error(f"Unknown path: {path}")
             await websocket.close()
             return
         
+        transport, session_type = session_types[url.path]
+        if transport not in transports:
+            logger.error(f"Transport '{transport}' is disabled (--transports)")
+            await websocket.close()
+            return
+        load_transport(transport)
+        
+        binary = (websocket.subprotocol == BINARY_SUBPROTOCOL or
+                  parse_qs(url.query).get('binary', ['0'])[0] in ('1', 'true'))
+        if binary:
+            logger.info("  Binary frames enabled")
+        
         loop = asyncio.get_event_loop()
-        session = session_types[path](websocket, loop)
+        session = session_type(websocket, loop, binary)
         await session.handle()
         
     except Exception as e:
@@ -731,16 +1466,22 @@ async def async_main(args):
     logger.info(f"Platform: {sys.platform}")
     logger.info(f"Mode: {'WSS (SSL)' if ssl_context else 'WS'}")
     logger.info(f"Port: {args.port}")
-    logger.info(f"BLE: {'✓ bleak' if BLEAK_AVAILABLE else '✗'}")
-    logger.info(f"BT Classic: {'✓ PyBluez' if PYBLUEZ_AVAILABLE else '✗'}")
+    ble = 'ble' in args.transports and BLEAK_AVAILABLE
+    bt = 'bt' in args.transports and PYBLUEZ_AVAILABLE
+    logger.info(f"BLE: {'✓ bleak' if ble else '✗'}")
+    logger.info(f"BT Classic: {'✓ PyBluez' if bt else '✗'}")
     logger.info("="*70)
     logger.info("Supported devices:")
-    logger.info("  • BBC micro:bit (BLE)")
-    logger.info("  • LEGO WeDo 2.0, Boost, Powered Up (BLE)")
-    logger.info("  • LEGO Mindstorms NXT (BT Classic)" if PYBLUEZ_AVAILABLE else "")
+    if ble:
+        logger.info("  • BBC micro:bit (BLE)")
+        logger.info("  • LEGO WeDo 2.0, Boost, Powered Up (BLE)")
+    if bt:
+        logger.info("  • LEGO Mindstorms NXT (BT Classic)")
     logger.info("="*70 + "\n")
     
-    async with websockets.serve(ws_handler, "0.0.0.0", args.port, ssl=ssl_context):
+    handler = functools.partial(ws_handler, transports=args.transports)
+    async with websockets.serve(handler, "0.0.0.0", args.port, ssl=ssl_context,
+                                select_subprotocol=select_binary_subprotocol):
         logger.info("✓ Server running")
         logger.info("Press Ctrl+C to stop\n")
         await asyncio.Future()
@@ -751,17 +1492,48 @@ def main():
     parser.add_argument('--no-ssl', action='store_true', help='Disable SSL')
     parser.add_argument('--port', type=int, default=SCRATCH_PORT, help='Port')
     parser.add_argument('--debug', action='store_true', help='Debug mode')
+    parser.add_argument('--transports', default=','.join(TRANSPORTS),
+                        help='Comma-separated transports to serve (ble, bt); '
+                             'backends are imported on first use')
+    parser.add_argument('--ble-scan-mode', choices=['active', 'passive'], default='active',
+                        help='Shared BLE scanner mode (passive is not supported on macOS)')
+    parser.add_argument('--notify-batch', action='store_true',
+                        help='Pack queued notifications into JSON-RPC batch arrays '
+                             '(clients must support batches)')
+    parser.add_argument('--notify-latest', choices=['off', 'auto', 'always'], default='off',
+                        help='Deliver only the latest unsent value per BLE characteristic '
+                             '(auto: while several sessions are open)')
+    parser.add_argument('--ble-write-mode', choices=['auto', 'response', 'no-response'],
+                        default='auto',
+                        help='BLE write type when the client does not specify withResponse')
+    parser.add_argument('--link-grace', type=float, default=30.0,
+                        help='Seconds to keep a device link open after its session '
+                             'closes, for reuse by the next session (0 disables)')
+    parser.add_argument('--nxt-keepalive', type=float, default=25.0,
+                        help='Send an NXT keepalive after this many idle seconds (0 disables)')
     
     args = parser.parse_args()
     
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
     
-    if not BLEAK_AVAILABLE:
+    BLESession.write_mode = args.ble_write_mode
+    BLESession.notify_latest = args.notify_latest
+    BLESession.registry.scanning_mode = args.ble_scan_mode
+    Session.batch_notifications = args.notify_batch
+    link_pool.grace = args.link_grace
+    BTSession.keepalive_idle = args.nxt_keepalive
+    
+    args.transports = tuple(t.strip() for t in args.transports.split(',') if t.strip())
+    unknown = set(args.transports) - set(TRANSPORTS)
+    if unknown or not args.transports:
+        parser.error(f"--transports takes a list of: {', '.join(TRANSPORTS)}")
+    
+    if 'ble' in args.transports and not BLEAK_AVAILABLE:
         logger.error("❌ Bleak required: pip install bleak")
         sys.exit(1)
     
-    if not args.no_ssl and not CRYPTO_AVAILABLE:
+    if not args.no_ssl and not CRYPTO_AVAILABLE and not CertificateManager().cert_path.exists():
         logger.error("❌ cryptography required: pip install cryptography")
         sys.exit(1)
     